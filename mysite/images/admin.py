@@ -1,5 +1,97 @@
 from django.contrib import admin
-from .models import Facility, Court, Booking, Blackout, UserProfile
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+from .blackouts import apply_blackout, cancel_bookings, confirm_bookings
+from .caching import touch_facility
+from .models import (
+    Facility, Court, Booking, BookingArchive, Blackout, UserProfile, PriceRule, Schedule, WaitlistEntry, ChangeEvent,
+)
+
+EXACT_COUNT_LIMIT = 10_000
+
+
+def _estimated_rows(queryset):
+    """The database's own row estimate for the queryset's table, if it keeps one."""
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        elif connection.vendor == "sqlite":
+            # Only present once ANALYZE has run.
+            try:
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            except DatabaseError:
+                return None
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts exactly up to ``EXACT_COUNT_LIMIT`` rows. Past that an unfiltered
+    changelist uses the database's estimate (a full count if there is none)
+    and a filtered one stops counting, so later pages need a narrower filter."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        exact = queryset.order_by()[:EXACT_COUNT_LIMIT + 1].count()
+        if exact <= EXACT_COUNT_LIMIT or queryset.query.where:
+            return exact
+        estimate = _estimated_rows(queryset)
+        return max(estimate, exact) if estimate else queryset.count()
+
+
+class InputFilter(admin.SimpleListFilter):
+    """A free-text sidebar filter for relations too large to list as links."""
+
+    template = "admin/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        others = QueryDict(changelist.get_query_string(remove=[self.parameter_name, PAGE_VAR])[1:])
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "query_parts": [(name, value) for name, values in others.lists() for value in values],
+            "display": "All",
+        }
+
+
+class RelatedInputFilter(InputFilter):
+    """Filter a foreign key by id, or by a case-insensitive match on the related name."""
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return None
+        if value.isdigit():
+            return queryset.filter(**{f"{self.parameter_name}_id": int(value)})
+        return queryset.filter(**{f"{self.parameter_name}__name__icontains": value})
+
+
+class FacilityFilter(RelatedInputFilter):
+    title = "facility"
+    parameter_name = "facility"
+
+
+class CourtFilter(RelatedInputFilter):
+    title = "court"
+    parameter_name = "court"
 
 
 class CourtInline(admin.TabularInline):
@@ -7,31 +99,157 @@ class CourtInline(admin.TabularInline):
     extra = 0
 
 
+class ScheduleInline(admin.TabularInline):
+    model = Schedule
+    extra = 0
+    autocomplete_fields = ("court",)
+
+
 @admin.register(Facility)
 class FacilityAdmin(admin.ModelAdmin):
     list_display = ("name", "sport_type", "location", "open_time", "close_time", "base_price")
     list_filter = ("sport_type",)
     search_fields = ("name", "location")
-    inlines = [CourtInline]
+    inlines = [CourtInline, ScheduleInline]
 
 
 @admin.register(Court)
 class CourtAdmin(admin.ModelAdmin):
     list_display = ("name", "facility", "is_active")
-    list_filter = ("facility", "is_active")
+    list_filter = (FacilityFilter, "is_active")
+    list_select_related = ("facility",)
     search_fields = ("name", "facility__name")
+    autocomplete_fields = ("facility",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["activate", "deactivate"]
+
+    def _set_active(self, request, queryset, active):
+        facility_ids = list(queryset.values_list("facility_id", flat=True).distinct())
+        with transaction.atomic():
+            courts = list(queryset.exclude(is_active=active))
+            updated = queryset.update(is_active=active)
+            for court in courts:
+                court.is_active = active
+            ChangeEvent.record(courts, "updated")
+        touch_facility(*facility_ids, listing=True)
+        self.message_user(request, f"{updated} courts {'activated' if active else 'deactivated'}.")
+
+    @admin.action(description="Activate selected courts")
+    def activate(self, request, queryset):
+        self._set_active(request, queryset, True)
+
+    @admin.action(description="Deactivate selected courts")
+    def deactivate(self, request, queryset):
+        self._set_active(request, queryset, False)
 
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     list_display = ("facility", "court", "user", "start_dt", "end_dt", "status", "price")
-    list_filter = ("status", "facility", "court")
+    list_filter = ("status", FacilityFilter, CourtFilter)
+    # Court.__str__ shows its facility too.
+    list_select_related = ("facility", "court__facility", "user")
     search_fields = ("user__username", "facility__name", "court__name")
+    autocomplete_fields = ("facility", "court", "user")
+    date_hierarchy = "start_dt"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["cancel_selected", "confirm_selected"]
+
+    @admin.action(description="Cancel selected bookings and notify users")
+    def cancel_selected(self, request, queryset):
+        cancelled = cancel_bookings(
+            queryset,
+            "Booking cancelled",
+            "Your booking at {facility}{court} on {start:%Y-%m-%d %H:%M} was cancelled by the facility.",
+        )
+        self.message_user(request, f"{cancelled} bookings cancelled.")
+
+    @admin.action(description="Re-confirm selected bookings")
+    def confirm_selected(self, request, queryset):
+        confirmed, skipped = confirm_bookings(queryset)
+        message = f"{confirmed} bookings confirmed."
+        if skipped:
+            message += f" {skipped} skipped because they no longer validate."
+        self.message_user(request, message)
+
+
+@admin.register(BookingArchive)
+class BookingArchiveAdmin(admin.ModelAdmin):
+    list_display = ("id", "facility", "court", "user", "start_dt", "end_dt", "status", "price", "archived_at")
+    list_filter = ("status",)
+    list_select_related = ("facility", "court__facility", "user")
+    search_fields = ("user__username", "facility__name")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Blackout)
 class BlackoutAdmin(admin.ModelAdmin):
     list_display = ("facility", "start_dt", "end_dt", "reason")
+    list_filter = (FacilityFilter,)
+    list_select_related = ("facility",)
+    search_fields = ("facility__name", "note")
+    autocomplete_fields = ("facility",)
+    date_hierarchy = "start_dt"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ["cancel_covered_bookings"]
+
+    @admin.action(description="Cancel the bookings covered by selected blackouts")
+    def cancel_covered_bookings(self, request, queryset):
+        cancelled = sum(apply_blackout(blackout, cancel=True) for blackout in queryset.select_related("facility"))
+        self.message_user(request, f"{cancelled} bookings cancelled and notified.")
+
+    def save_model(self, request, obj, form, change):
+        if change and not {"facility", "start_dt", "end_dt"} & set(form.changed_data):
+            return super().save_model(request, obj, form, change)
+        apply_blackout(obj, cancel=False)
+
+
+@admin.register(PriceRule)
+class PriceRuleAdmin(admin.ModelAdmin):
+    list_display = ("facility", "label", "court", "sport", "weekdays", "start_time", "end_time", "price_per_hour",
+                    "priority")
+    list_filter = (FacilityFilter, CourtFilter)
+    list_select_related = ("facility", "court__facility", "sport")
+    search_fields = ("label", "facility__name")
+    autocomplete_fields = ("facility", "court")
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ("user", "facility", "court", "start_dt", "end_dt", "status", "auto_book", "created_at")
+    list_filter = ("status", "auto_book", FacilityFilter, CourtFilter)
+    list_select_related = ("user", "facility", "court__facility")
+    search_fields = ("user__username", "facility__name")
+    autocomplete_fields = ("user", "facility", "court", "booking")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ChangeEvent)
+class ChangeEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "action", "object_id", "facility_id", "created_at")
+    list_filter = ("kind", "action")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(UserProfile)
@@ -0,0 +1,99 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Booking attempts admitted at once per facility, across workers. Admitted
+# attempts still validate and save one at a time under the facility row lock.
+BOOKING_CONCURRENCY = getattr(settings, "BOOKING_CONCURRENCY", 4)
+# How long an attempt waits for a free place before it is turned away.
+BOOKING_QUEUE_SECONDS = getattr(settings, "BOOKING_QUEUE_SECONDS", 1.0)
+# A place is freed after this long even if its worker died holding it.
+LEASE_SECONDS = 10
+POLL_SECONDS = 0.05
+RETRY_AFTER = 2
+
+TAKEN_SECONDS = 5
+TAKEN_MAX_ENTRIES = 10_000
+
+
+class Busy(Exception):
+    def __init__(self, retry_after=RETRY_AFTER):
+        super().__init__("Too many booking attempts for this facility.")
+        self.retry_after = retry_after
+
+
+def _place_key(facility_id, i):
+    return f"admit:{facility_id}:{i}"
+
+
+def _acquire(facility_id, token):
+    for i in range(BOOKING_CONCURRENCY):
+        key = _place_key(facility_id, i)
+        if cache.add(key, token, LEASE_SECONDS):
+            return key
+    return None
+
+
+@contextmanager
+def gate(facility_id):
+    """Admit at most ``BOOKING_CONCURRENCY`` booking attempts per facility at a time.
+
+    Places are cache keys taken with ``cache.add``, so the limit holds for
+    every worker sharing the cache. Waits up to ``BOOKING_QUEUE_SECONDS`` for
+    a place, then raises ``Busy``.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + BOOKING_QUEUE_SECONDS
+    key = _acquire(facility_id, token)
+    while key is None:
+        if time.monotonic() >= deadline:
+            raise Busy()
+        time.sleep(POLL_SECONDS)
+        key = _acquire(facility_id, token)
+    try:
+        yield
+    finally:
+        # The lease may have lapsed and gone to someone else; leave theirs alone.
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+class _TakenSlots:
+    """In-process, short-lived record of slots known to be booked.
+
+    Only ever a shortcut: a miss falls through to full validation, and a
+    stale hit lasts at most ``TAKEN_SECONDS``.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, facility_id, court_id, start, end):
+        with self._lock:
+            self._entries[(facility_id, court_id, start, end)] = time.monotonic() + TAKEN_SECONDS
+            self._entries.move_to_end((facility_id, court_id, start, end))
+            while len(self._entries) > TAKEN_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def discard(self, facility_id, court_id, start, end):
+        with self._lock:
+            self._entries.pop((facility_id, court_id, start, end), None)
+
+    def __contains__(self, key):
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False
+            return True
+
+
+taken = _TakenSlots()
@@ -0,0 +1,258 @@
+import math
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import facility_version
+from .history import booking_history
+from .models import Blackout, Booking
+from .pricing import CENTS, price_table
+from .services import day_bounds, generate_slots
+from .validation import LEAD_TIME
+
+HOURS_PER_WEEK = 7 * 24
+TREND_WINDOW = 7
+# Short, because slots drop out of the lead time as the clock moves.
+MONTH_CACHE_SECONDS = 60
+
+
+def _timestamps(values):
+    return np.fromiter((v.timestamp() for v in values), dtype=np.float64, count=len(values))
+
+
+def _slot_axis(facility, first, last, court_id=None):
+    """Every slot of a court from ``first`` to ``last`` in order: start, end, hour of week and day index."""
+    tz = facility.tzinfo
+    starts, ends, hours, days = [], [], [], []
+    day, i = first, 0
+    while day <= last:
+        for s, e in generate_slots(facility, day, court_id):
+            local = s.astimezone(tz)
+            starts.append(s)
+            ends.append(e)
+            hours.append(local.weekday() * 24 + local.hour)
+            days.append(i)
+        day += timedelta(days=1)
+        i += 1
+    return _timestamps(starts), _timestamps(ends), np.array(hours, dtype=np.intp), np.array(days, dtype=np.intp)
+
+
+def _coverage(slot_starts, slot_ends, starts, ends, rows, n_rows):
+    """(n_rows, n_slots) mask of slots overlapped by [starts, ends) on each row."""
+    lo = np.searchsorted(slot_ends, starts, side="right")
+    hi = np.searchsorted(slot_starts, ends, side="left")
+    keep = lo < hi
+    diff = np.zeros((n_rows, len(slot_starts) + 1), dtype=np.int32)
+    np.add.at(diff, (rows[keep], lo[keep]), 1)
+    np.add.at(diff, (rows[keep], hi[keep]), -1)
+    return np.cumsum(diff[:, :-1], axis=1) > 0
+
+
+def _ratio(num, den):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), np.nan)
+
+
+def _database_bookings(facility, lo, hi, column, snapshot=None):
+    filters = {"facility_id": facility.pk, "status": "confirmed", "start_dt__lt": hi, "end_dt__gt": lo}
+    if snapshot is None:
+        found = Booking.objects.filter(**filters).values_list("court_id", "start_dt", "end_dt", "price")
+    else:
+        # What the snapshot leaves out, from both tables since the snapshot holds archived rows too.
+        settled = datetime.fromisoformat(snapshot["settled_before"])
+        found = (
+            (r["court_id"], r["start_dt"], r["end_dt"], r["price"]) for r in booking_history(
+                Q(start_dt__gte=settled) | Q(id__gt=snapshot["last_id"]), **filters
+            )
+        )
+    rows = [r for r in found if r[0] in column]
+    court_ids, starts, ends, prices = zip(*rows) if rows else ((), (), (), ())
+    cols = np.fromiter((column[c] for c in court_ids), dtype=np.intp, count=len(court_ids))
+    return cols, _timestamps(starts), _timestamps(ends), np.array(prices, dtype=np.float64)
+
+
+def _snapshot_bookings(snapshot, facility, lo, hi, column):
+    data = snapshot["data"]
+    code = next((i for i, f in enumerate(snapshot["facilities"]) if f["id"] == facility.pk), None)
+    # Court codes shifted by one so NO_COURT lands on index 0.
+    lookup = np.array(
+        [column.get(None, -1)] + [column.get(c["id"], -1) for c in snapshot["courts"]], dtype=np.intp
+    )
+    # Rounded up so a booking starting within the settling second is read from one side only.
+    settled = math.ceil(datetime.fromisoformat(snapshot["settled_before"]).timestamp())
+    mask = (
+        (data["facility"] == code)
+        & (data["status"] == snapshot["statuses"].index("confirmed"))
+        & (data["start"] < np.datetime64(min(int(hi.timestamp()), settled), "s"))
+        & (data["end"] > np.datetime64(int(lo.timestamp()), "s"))
+    )
+    cols = lookup[data["court"][mask] + 1]
+    keep = cols >= 0
+    return (
+        cols[keep],
+        data["start"][mask][keep].astype(np.int64).astype(np.float64),
+        data["end"][mask][keep].astype(np.int64).astype(np.float64),
+        data["price"][mask][keep] / 100,
+    )
+
+
+def utilization(facility, first, last, snapshot=None):
+    """Occupancy and revenue of ``facility`` from ``first`` to ``last`` (dates, inclusive).
+
+    Confirmed bookings are read in one ``values_list`` pass, or from a
+    ``load_snapshot()`` result for bookings starting before its
+    ``settled_before`` and from the database for the rest and for rows
+    created since it was taken, so later cancellations and moves count. They
+    are laid over each court's slot grid as NumPy arrays; blacked-out slots
+    don't count as available. Courts are columns (a single ``None`` column
+    for court-less facilities). Ratios with no available time are NaN.
+    """
+    courts = list(facility.courts.order_by("name").values_list("pk", "name")) or [(None, facility.name)]
+    column = {pk: i for i, (pk, _) in enumerate(courts)}
+    n_cols, n_days = len(courts), (last - first).days + 1
+    lo, hi = day_bounds(first, facility.tzinfo)[0], day_bounds(last, facility.tzinfo)[1]
+
+    if snapshot is not None:
+        cols, starts, ends, prices = (
+            np.concatenate(parts) for parts in zip(
+                _snapshot_bookings(snapshot, facility, lo, hi, column),
+                _database_bookings(facility, lo, hi, column, snapshot),
+            )
+        )
+    else:
+        cols, starts, ends, prices = _database_bookings(facility, lo, hi, column)
+    revenue = np.bincount(cols, weights=prices, minlength=n_cols)
+
+    blackouts = list(Blackout.objects.filter(facility=facility, start_dt__lt=hi, end_dt__gt=lo).values_list(
+        "start_dt", "end_dt"))
+    b_starts, b_ends = zip(*blackouts) if blackouts else ((), ())
+    b_starts, b_ends = _timestamps(b_starts), _timestamps(b_ends)
+
+    week_used, week_available = np.zeros((HOURS_PER_WEEK, n_cols)), np.zeros((HOURS_PER_WEEK, n_cols))
+    day_used, day_available = np.zeros(n_days), np.zeros(n_days)
+    court_used, court_available = np.zeros(n_cols), np.zeros(n_cols)
+    # Courts may run different schedules, so each gets its own slot axis.
+    for j, (pk, _) in enumerate(courts):
+        slot_starts, slot_ends, hour_of_week, day_index = _slot_axis(facility, first, last, pk)
+        mine = cols == j
+        booked = _coverage(slot_starts, slot_ends, starts[mine], ends[mine],
+                           np.zeros(int(mine.sum()), dtype=np.intp), 1)[0]
+        blocked = _coverage(slot_starts, slot_ends, b_starts, b_ends, np.zeros(len(blackouts), dtype=np.intp), 1)[0]
+        available = np.where(blocked, 0.0, (slot_ends - slot_starts) / 3600)
+        used = np.where(booked, available, 0.0)
+        week_used[:, j] = np.bincount(hour_of_week, weights=used, minlength=HOURS_PER_WEEK)
+        week_available[:, j] = np.bincount(hour_of_week, weights=available, minlength=HOURS_PER_WEEK)
+        day_used += np.bincount(day_index, weights=used, minlength=n_days)
+        day_available += np.bincount(day_index, weights=available, minlength=n_days)
+        court_used[j], court_available[j] = used.sum(), available.sum()
+    window = np.ones(min(TREND_WINDOW, n_days))
+
+    return {
+        "courts": courts,
+        "days": [first + timedelta(days=i) for i in range(n_days)],
+        "hour_of_week": _ratio(week_used, week_available),
+        "hour_of_week_total": _ratio(week_used.sum(axis=1), week_available.sum(axis=1)),
+        "daily": _ratio(day_used, day_available),
+        "trend": _ratio(np.convolve(day_used, window, "valid"), np.convolve(day_available, window, "valid")),
+        "court_utilization": _ratio(court_used, court_available),
+        "court_revpah": _ratio(revenue, court_available),
+        "booked_hours": float(court_used.sum()),
+        "available_hours": float(court_available.sum()),
+        "revenue": float(revenue.sum()),
+        "revpah": float(_ratio(revenue.sum(), court_available.sum())),
+    }
+
+
+def _month_days(year, month):
+    first = date(year, month, 1)
+    last = (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return first, last
+
+
+def month_availability(facility, court, year, month, now=None):
+    """Per-day free slot counts, state and cheapest free slot for a month.
+
+    Covers ``court``, or every active court of ``facility`` when it is None
+    (the facility itself when it has none). Bookings and blackouts come from
+    one range query each and are laid over each court's slots as NumPy
+    arrays. Results are cached per facility version for
+    ``MONTH_CACHE_SECONDS``.
+    """
+    key = f"month:{facility.pk}:{court.pk if court else ''}:{year}-{month:02d}:{facility_version(facility.pk)}"
+    days = cache.get(key)
+    if days is not None:
+        return days
+
+    now = now or timezone.now()
+    tz = facility.tzinfo
+    first, last = _month_days(year, month)
+    court_ids = [court.pk] if court else (
+        list(facility.courts.filter(is_active=True).order_by("name").values_list("pk", flat=True)) or [None]
+    )
+    n_days = (last - first).days + 1
+
+    lo, hi = day_bounds(first, tz)[0], day_bounds(last, tz)[1]
+    bookings = [
+        (c, s, e) for c, s, e in Booking.objects.filter(
+            facility=facility, status="confirmed", start_dt__lt=hi, end_dt__gt=lo,
+        ).values_list("court_id", "start_dt", "end_dt")
+        if c in court_ids
+    ]
+    blackouts = list(Blackout.objects.filter(facility=facility, start_dt__lt=hi, end_dt__gt=lo).values_list(
+        "start_dt", "end_dt"))
+    b_starts, b_ends = zip(*blackouts) if blackouts else ((), ())
+    b_starts, b_ends = _timestamps(b_starts), _timestamps(b_ends)
+
+    table = price_table(facility)
+    cutoff = (now + LEAD_TIME).timestamp()
+    capacity, free_count = np.zeros(n_days, dtype=int), np.zeros(n_days, dtype=int)
+    cheapest = np.full(n_days, np.inf)
+    # Courts may run different schedules, so each gets its own slot axis.
+    for pk in court_ids:
+        starts, ends, day_index, prices = [], [], [], []
+        for i in range(n_days):
+            for s, e in generate_slots(facility, first + timedelta(days=i), pk):
+                local = timezone.localtime(s, tz)
+                entry = table["prices"][pk][local.weekday()].get(local.hour * 60 + local.minute)
+                starts.append(s)
+                ends.append(e)
+                day_index.append(i)
+                prices.append(entry[0] if entry else Decimal(facility.base_price) * (e - s).seconds / 3600)
+        slot_starts, slot_ends = _timestamps(starts), _timestamps(ends)
+        day_index, prices = np.array(day_index, dtype=np.intp), np.array(prices, dtype=np.float64)
+
+        mine = [(s, e) for c, s, e in bookings if c == pk]
+        m_starts, m_ends = zip(*mine) if mine else ((), ())
+        booked = _coverage(slot_starts, slot_ends, _timestamps(m_starts), _timestamps(m_ends),
+                           np.zeros(len(mine), dtype=np.intp), 1)[0]
+        blocked = _coverage(slot_starts, slot_ends, b_starts, b_ends, np.zeros(len(blackouts), dtype=np.intp), 1)[0]
+
+        open_ = ~blocked & (slot_starts >= cutoff)
+        free = open_ & ~booked
+        capacity += np.bincount(day_index, weights=open_, minlength=n_days).astype(int)
+        free_count += np.bincount(day_index, weights=free, minlength=n_days).astype(int)
+        np.minimum.at(cheapest, day_index[free], prices[free])
+
+    days = []
+    for i in range(n_days):
+        if not capacity[i]:
+            state = "closed"
+        elif not free_count[i]:
+            state = "full"
+        elif free_count[i] == capacity[i]:
+            state = "free"
+        else:
+            state = "partial"
+        days.append({
+            "date": first + timedelta(days=i),
+            "free": int(free_count[i]),
+            "capacity": int(capacity[i]),
+            "state": state,
+            "cheapest": Decimal(str(cheapest[i])).quantize(CENTS) if np.isfinite(cheapest[i]) else None,
+        })
+    cache.set(key, days, MONTH_CACHE_SECONDS)
+    return days
@@ -0,0 +1,122 @@
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import occupancy, waitlist
+from .caching import touch_facility
+from .models import Booking, ChangeEvent, Court, Facility, Notification
+from .validation import validate_bookings
+
+PREVIEW_LIMIT = 50
+BATCH_SIZE = 500
+
+
+def affected_bookings(facility, start, end):
+    """Confirmed bookings of ``facility`` overlapping [start, end), via the (facility, start_dt) index."""
+    return (
+        Booking.objects.filter(facility=facility, status="confirmed", start_dt__lt=end, end_dt__gt=start)
+        .select_related("user", "court")
+        .order_by("start_dt")
+    )
+
+
+def notify_bookings(rows, subject, body, **context):
+    """Queue one notification per (user_id, facility name, court name, start, facility time zone) row."""
+    Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            subject=subject,
+            body=body.format(facility=facility, court=f" ({court})" if court else "",
+                             start=timezone.localtime(start, ZoneInfo(tz)), **context),
+        )
+        for user_id, facility, court, start, tz in rows
+    ], batch_size=BATCH_SIZE)
+
+
+def cancel_bookings(queryset, subject, body, **context):
+    """Cancel the confirmed bookings in ``queryset`` with one conditional UPDATE.
+
+    Occupancy and cached pages of the touched facilities are refreshed, a
+    notification per booking is queued and each freed slot is offered to
+    the waitlist. Returns the number of bookings cancelled.
+    """
+    with transaction.atomic():
+        queryset = queryset.filter(status="confirmed")
+        rows = list(queryset.select_for_update(of=("self",)).values_list(
+            "pk", "user_id", "facility_id", "facility__name", "court_id", "court__name", "start_dt", "end_dt",
+            "facility__timezone",
+        ))
+        if not rows:
+            return 0
+        ids = [r[0] for r in rows]
+        for i in range(0, len(ids), BATCH_SIZE):
+            Booking.objects.filter(pk__in=ids[i:i + BATCH_SIZE], status="confirmed").update(
+                status="cancelled", version=F("version") + 1
+            )
+        ChangeEvent.record([
+            Booking(pk=r[0], facility_id=r[2], court_id=r[4], start_dt=r[6], end_dt=r[7], status="cancelled")
+            for r in rows
+        ], "updated")
+        notify_bookings([(r[1], r[3], r[5], r[6], r[8]) for r in rows], subject, body, **context)
+        facilities = Facility.objects.in_bulk({r[2] for r in rows})
+        courts = Court.objects.in_bulk({r[4] for r in rows if r[4]})
+        occupancy.sync([(r[2], r[4], r[6], r[7]) for r in rows], facilities)
+        for r in rows:
+            waitlist.promote(facilities[r[2]], courts.get(r[4]), r[6], r[7])
+    touch_facility(*{r[2] for r in rows})
+    return len(rows)
+
+
+def confirm_bookings(queryset):
+    """Re-confirm the cancelled bookings in ``queryset`` that still pass validation.
+
+    Candidates are validated a batch at a time and each batch is confirmed
+    with one UPDATE before the next is checked, so they can't clash with
+    each other. Returns (confirmed, skipped).
+    """
+    with transaction.atomic():
+        candidates = list(
+            queryset.filter(status="cancelled").select_for_update(of=("self",)).select_related("facility", "court")
+        )
+        confirmed = []
+        for i in range(0, len(candidates), BATCH_SIZE):
+            batch = candidates[i:i + BATCH_SIZE]
+            valid = [b for b, errors in zip(batch, validate_bookings(batch)) if not errors]
+            Booking.objects.filter(pk__in=[b.pk for b in valid], status="cancelled").update(
+                status="confirmed", version=F("version") + 1
+            )
+            for b in valid:
+                b.status, b.version = "confirmed", b.version + 1
+            confirmed += valid
+        ChangeEvent.record(confirmed, "updated")
+        occupancy.sync(
+            [(b.facility_id, b.court_id, b.start_dt, b.end_dt) for b in confirmed],
+            {b.facility_id: b.facility for b in confirmed},
+        )
+    touch_facility(*{b.facility_id for b in confirmed})
+    return len(confirmed), len(candidates) - len(confirmed)
+
+
+def apply_blackout(blackout, cancel):
+    """Save ``blackout`` and cancel (or just notify) the confirmed bookings it covers."""
+    with transaction.atomic():
+        blackout.save()
+        affected = affected_bookings(blackout.facility, blackout.start_dt, blackout.end_dt)
+        note = blackout.note or blackout.reason or "maintenance"
+        if cancel:
+            return cancel_bookings(
+                affected,
+                "Booking cancelled: facility unavailable",
+                "Your booking at {facility}{court} on {start:%Y-%m-%d %H:%M} was cancelled "
+                "because the facility is unavailable at that time: {note}",
+                note=note,
+            )
+        notify_bookings(
+            affected.values_list("user_id", "facility__name", "court__name", "start_dt", "facility__timezone"),
+            "Notice about your booking",
+            "A notice was posted for {facility}{court} covering your booking on {start:%Y-%m-%d %H:%M}: {note}",
+            note=note,
+        )
+        return 0
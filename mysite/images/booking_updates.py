@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import admission, occupancy, waitlist
+from .caching import touch_facility
+from .models import Booking, ChangeEvent, Court
+from .validation import lock_facility, validate_booking
+
+CHANGE_NOTICE = timedelta(hours=1)
+
+
+class BookingConflict(Exception):
+    """A cancel or modify that found the booking, or the slot it moves to, no longer as the caller last saw it."""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def _conflict(pk, user_id, version, action):
+    """Why the conditional UPDATE matched nothing; only read when it did."""
+    row = Booking.objects.filter(pk=pk, user_id=user_id).values("status", "start_dt", "version").first()
+    if row is None:
+        raise Booking.DoesNotExist
+    if row["version"] != version:
+        return BookingConflict(
+            "This booking was changed in another window since you opened it. Review it and try again.", "stale"
+        )
+    if row["status"] != "confirmed":
+        return BookingConflict("This booking is already cancelled.", "cancelled")
+    return BookingConflict(f"{action} must be at least 1 hour in advance.", "notice")
+
+
+def _changeable(pk, user_id, version, now):
+    if version is None:
+        # A form without a version can't prove it saw the current row.
+        raise BookingConflict("This page is out of date. Reload it and try again.", "stale")
+    return Booking.objects.filter(
+        pk=pk, user_id=user_id, version=version, status="confirmed", start_dt__gte=now + CHANGE_NOTICE
+    )
+
+
+def cancel(pk, user, version, now=None):
+    """Cancel ``user``'s booking with one conditional UPDATE and return it.
+
+    Only a confirmed booking at least ``CHANGE_NOTICE`` away and still at
+    ``version`` is cancelled; otherwise raises
+    ``BookingConflict`` (or ``Booking.DoesNotExist``). The UPDATE skips
+    ``post_save``, so occupancy, the journal, cached pages and the waitlist
+    are updated here.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        if not _changeable(pk, user.pk, version, now).update(status="cancelled", version=F("version") + 1):
+            raise _conflict(pk, user.pk, version, "Cancellations")
+        booking = Booking.objects.select_related("facility", "court").get(pk=pk)
+        ChangeEvent.record([booking], "updated")
+        occupancy.sync(occupancy.written_spans(booking), {booking.facility_id: booking.facility})
+        waitlist.promote(booking.facility, booking.court, booking.start_dt, booking.end_dt, now=now)
+    touch_facility(booking.facility_id)
+    admission.taken.discard(booking.facility_id, str(booking.court_id or ""), booking.start_dt, booking.end_dt)
+    return booking
+
+
+def modify(booking, version, now=None):
+    """Write ``booking``'s new court and times if the stored row is still at ``version``.
+
+    ``booking`` is a validated instance loaded from the database, so its
+    loaded values describe the slot being given up. Only the changed
+    columns are written, in one conditional UPDATE; the new slot is checked
+    again under the facility lock and the old one is offered to the
+    waitlist. Raises ``BookingConflict`` like ``cancel``, or with the
+    validation code when the new slot was taken meanwhile.
+    """
+    now = now or timezone.now()
+    old_court_id, old_start, old_end = (booking._loaded[f] for f in ("court_id", "start_dt", "end_dt"))
+    with transaction.atomic():
+        lock_facility(booking.facility_id)
+        updated = _changeable(booking.pk, booking.user_id, version, now).update(
+            court_id=booking.court_id, start_dt=booking.start_dt, end_dt=booking.end_dt, version=F("version") + 1,
+        )
+        if not updated:
+            raise _conflict(booking.pk, booking.user_id, version, "Modifications")
+        errors = validate_booking(booking, now=now)
+        if errors:
+            raise BookingConflict(errors[0].message, errors[0].code)
+        booking.version = version + 1
+        ChangeEvent.record([booking], "updated")
+        occupancy.sync(occupancy.written_spans(booking), {booking.facility_id: booking.facility})
+        if old_court_id != booking.court_id or not (old_start < booking.end_dt and old_end > booking.start_dt):
+            old_court = Court.objects.filter(pk=old_court_id).first() if old_court_id else None
+            waitlist.promote(booking.facility, old_court, old_start, old_end, now=now)
+    touch_facility(booking.facility_id)
+    admission.taken.discard(booking.facility_id, str(old_court_id or ""), old_start, old_end)
+    return booking
@@ -0,0 +1,115 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+
+FACILITY_LIST_TAG = "facilities"
+# Narrower tags for data compiled from one kind of row, so that e.g. a new
+# booking doesn't throw away a facility's compiled price table.
+PRICES = "prices"
+SCHEDULE = "schedule"
+BLACKOUTS = "blackouts"
+
+
+def facility_tag(facility_id, part=None):
+    return f"facility:{facility_id}" if part is None else f"facility:{facility_id}:{part}"
+
+
+def _tag_key(tag):
+    return f"tagver:{tag}"
+
+
+def tag_versions(tags):
+    # Tags live in the cache as opaque tokens; a tag that was evicted gets a
+    # fresh token, so anything stored against the old one reads as stale.
+    keys = {_tag_key(t): t for t in tags}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, tag in keys.items():
+        if key not in found:
+            found[key] = time.time_ns()
+            cache.add(key, found[key], None)
+        versions[tag] = found[key]
+    return versions
+
+
+def bump_tags(*tags):
+    token = time.time_ns()
+    cache.set_many({_tag_key(t): token for t in tags}, None)
+
+
+def touch_facility(*facility_ids, listing=False):
+    tags = [facility_tag(fid) for fid in facility_ids if fid]
+    if listing:
+        tags.append(FACILITY_LIST_TAG)
+    if tags:
+        bump_tags(*tags)
+
+
+def touch_compiled(facility_id, *parts):
+    bump_tags(*(facility_tag(facility_id, part) for part in parts))
+
+
+def facility_version(facility_id, part=None):
+    tag = facility_tag(facility_id, part)
+    return tag_versions([tag])[tag]
+
+
+def _page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page:{request.method}:{path}"
+
+
+def _is_cacheable_request(request):
+    # Anonymous is decided from cookies alone so a hit never loads the session.
+    return (
+        request.method in ("GET", "HEAD")
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+def _is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    )
+
+
+def anonymous_page_cache(tags):
+    """Cache full pages for anonymous GETs, purged through ``tags(request, *args, **kwargs)``."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request)
+            entry = cache.get(key)
+            if entry is not None:
+                versions, content, content_type = entry
+                if tag_versions(versions) == versions:
+                    return HttpResponse(content, content_type=content_type)
+
+            # Snapshot before rendering so a write that lands mid-render
+            # leaves this entry already stale.
+            versions = tag_versions(tags(request, *args, **kwargs))
+            response = view(request, *args, **kwargs)
+            if _is_cacheable_response(request, response):
+                cache.set(
+                    key,
+                    (versions, response.content, response["Content-Type"]),
+                    settings.PAGE_CACHE_SECONDS,
+                )
+            return response
+
+        return wrapper
+
+    return decorator
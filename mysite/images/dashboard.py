@@ -0,0 +1,119 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Prefetch, Q, Sum
+from django.utils import timezone
+
+from .models import Booking, Court, Facility
+from .schedules import prefetch_schedules
+from .services import day_bounds, generate_slots
+
+DASHBOARD_CACHE_SECONDS = 60
+UPCOMING_DAYS = 7
+
+
+def _periods(tz, now):
+    today = timezone.localdate(now, tz)
+    week = today - timedelta(days=today.weekday())
+    month = today.replace(day=1)
+    next_month = (month + timedelta(days=32)).replace(day=1)
+    return {
+        "today": day_bounds(today, tz),
+        "week": (day_bounds(week, tz)[0], day_bounds(week + timedelta(days=6), tz)[1]),
+        "month": (day_bounds(month, tz)[0], day_bounds(next_month - timedelta(days=1), tz)[1]),
+        "upcoming": (now, now + timedelta(days=UPCOMING_DAYS)),
+    }
+
+
+def _in_period(periods_by_tz, name):
+    # Facilities in different zones have different "today"s; one OR branch per zone.
+    q = Q(pk__in=[])
+    for tz_name, periods in periods_by_tz.items():
+        lo, hi = periods[name]
+        q |= Q(facility__timezone=tz_name, start_dt__gte=lo, start_dt__lt=hi)
+    return q
+
+
+def _available_hours(facility, now):
+    """Bookable hours in the upcoming window, counting a court-less facility as one court."""
+    first, end = timezone.localdate(now, facility.tzinfo), now + timedelta(days=UPCOMING_DAYS)
+    return sum(
+        (e - s).total_seconds() / 3600
+        for court_id in [c.pk for c in facility.active_courts] or [None]
+        for i in range(UPCOMING_DAYS + 1)
+        for s, e in generate_slots(facility, first + timedelta(days=i), court_id)
+        if now <= s < end
+    )
+
+
+def provider_stats(owner, now=None):
+    """Per-facility counters for ``owner``'s dashboard, cached for ``DASHBOARD_CACHE_SECONDS``.
+
+    Reads the facilities with their active courts, the compiled schedules
+    missing from the cache, and one grouped aggregate over the bookings
+    starting in the current week, month or upcoming window: at most four
+    queries however many facilities there are, while the Python work grows
+    with the number of facilities rather than the size of their history.
+    """
+    key = f"dashboard:{owner.pk}"
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    now = now or timezone.now()
+    facilities = list(
+        Facility.objects.filter(owner=owner)
+        .prefetch_related(Prefetch(
+            "courts", queryset=Court.objects.filter(is_active=True).only("pk", "facility_id"),
+            to_attr="active_courts",
+        ))
+        .order_by("name")
+    )
+    prefetch_schedules(facilities)
+    periods = {f.timezone: _periods(f.tzinfo, now) for f in facilities}
+    confirmed, cancelled = Q(status="confirmed"), Q(status="cancelled")
+    today, this_week = _in_period(periods, "today"), _in_period(periods, "week")
+    this_month, upcoming = _in_period(periods, "month"), _in_period(periods, "upcoming")
+    duration = ExpressionWrapper(F("end_dt") - F("start_dt"), output_field=DurationField())
+    rows = (
+        Booking.objects.filter(facility__in=facilities)
+        .filter(this_week | this_month | upcoming)
+        .values("facility_id")
+        .annotate(
+            today=Count("pk", filter=confirmed & today),
+            week=Count("pk", filter=confirmed & this_week),
+            month=Count("pk", filter=confirmed & this_month),
+            cancelled=Count("pk", filter=cancelled & this_month),
+            revenue_today=Sum("price", filter=confirmed & today),
+            revenue_week=Sum("price", filter=confirmed & this_week),
+            revenue_month=Sum("price", filter=confirmed & this_month),
+            upcoming=Count("pk", filter=confirmed & upcoming),
+            upcoming_time=Sum(duration, filter=confirmed & upcoming),
+        )
+        .order_by()
+    )
+    by_facility = {row.pop("facility_id"): row for row in rows}
+
+    stats = []
+    for f in facilities:
+        row = by_facility.get(f.pk, {})
+        month, cancelled_count = row.get("month", 0), row.get("cancelled", 0)
+        available = _available_hours(f, now)
+        booked = (row.get("upcoming_time") or timedelta()).total_seconds() / 3600
+        stats.append({
+            "facility_id": f.pk,
+            "name": f.name,
+            "today": row.get("today", 0),
+            "week": row.get("week", 0),
+            "month": month,
+            "revenue_today": row.get("revenue_today") or Decimal(0),
+            "revenue_week": row.get("revenue_week") or Decimal(0),
+            "revenue_month": row.get("revenue_month") or Decimal(0),
+            "cancellation_rate": round(100 * cancelled_count / (month + cancelled_count))
+            if month + cancelled_count else None,
+            "upcoming": row.get("upcoming", 0),
+            "upcoming_load": round(100 * booked / available) if available else None,
+        })
+    cache.set(key, stats, DASHBOARD_CACHE_SECONDS)
+    return stats
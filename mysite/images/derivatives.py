@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .caching import touch_facility
+from .models import Facility
+
+logger = logging.getLogger(__name__)
+
+# Target widths for the thumbnail, card and hero renditions; aspect ratio is kept.
+WIDTHS = {"thumb": 320, "card": 640, "hero": 1280}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-derivatives")
+
+
+def _flatten(image):
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def render(data):
+    """Encode ``data`` (an image file's bytes) at each width in ``WIDTHS``.
+
+    Yields (variant, format, width, bytes). Images are never upscaled, and a
+    width the previous variant already reached is skipped.
+    """
+    with Image.open(BytesIO(data)) as original:
+        image = _flatten(original)
+    previous = 0
+    for variant, width in sorted(WIDTHS.items(), key=lambda item: item[1]):
+        width = min(width, image.width)
+        if width <= previous:
+            continue
+        previous = width
+        resized = image if width == image.width else image.resize(
+            (width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS
+        )
+        for fmt, (pil_format, options) in FORMATS.items():
+            out = BytesIO()
+            resized.save(out, pil_format, **options)
+            yield variant, fmt, width, out.getvalue()
+
+
+def build(facility):
+    """Write the derivatives of ``facility.image`` next to it and record them.
+
+    Names carry a hash of the original's content, so each URL is immutable
+    and can be cached indefinitely. Derivatives of a previous upload are
+    deleted. Returns False if the image changed again while rendering.
+    """
+    field = facility.image
+    source = field.name
+    storage = field.storage
+    with storage.open(source, "rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    stem = posixpath.splitext(source)[0]
+
+    variants = {"source": source, "hash": digest}
+    for variant, fmt, width, content in render(data):
+        name = f"{stem}.{digest}.{variant}.{'jpg' if fmt == 'jpeg' else fmt}"
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(content))
+        variants.setdefault(fmt, []).append([name, width])
+
+    with transaction.atomic():
+        current = Facility.objects.select_for_update().filter(pk=facility.pk, image=source).first()
+        if current is None:
+            return False
+        stale = {name for fmt in FORMATS for name, _ in current.image_variants.get(fmt, [])}
+        Facility.objects.filter(pk=facility.pk).update(image_variants=variants)
+        touch_facility(facility.pk, listing=True)
+    for name in stale - {name for fmt in FORMATS for name, _ in variants[fmt]}:
+        storage.delete(name)
+    facility.image_variants = variants
+    return True
+
+
+def _build_in_background(facility_id):
+    close_old_connections()
+    try:
+        facility = Facility.objects.filter(pk=facility_id).first()
+        if facility is not None and facility.image:
+            build(facility)
+    except Exception:
+        logger.exception("Building image derivatives for facility %s failed", facility_id)
+    finally:
+        close_old_connections()
+
+
+def _report(future):
+    if future.cancelled():
+        logger.warning("Building image derivatives was cancelled; run build_image_derivatives")
+    elif future.exception() is not None:
+        logger.error("Building image derivatives failed", exc_info=future.exception())
+
+
+def _submit(facility_id):
+    try:
+        future = _executor.submit(_build_in_background, facility_id)
+    except RuntimeError:
+        # The executor refuses new work once the interpreter is shutting down.
+        logger.warning("Image derivatives for facility %s not scheduled; run build_image_derivatives", facility_id)
+        return
+    future.add_done_callback(_report)
+
+
+def schedule(facility_id):
+    """Build derivatives off the request path once the current transaction commits.
+
+    The single background thread lives only as long as this process, so
+    work queued when it exits is lost; failures are logged, never raised.
+    ``build_image_derivatives`` is the recovery path for anything missed.
+    """
+    transaction.on_commit(lambda: _submit(facility_id))
+
+
+def needs_build(facility):
+    return bool(facility.image) and facility.image_variants.get("source") != facility.image.name
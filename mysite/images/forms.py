@@ -1,8 +1,10 @@
+from zoneinfo import available_timezones
+
 from django import forms
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
 
-from .models import Booking, UserProfile, Court, Facility, Blackout
+from .models import Booking, UserProfile, Court, Facility, Blackout, WaitlistEntry
 
 
 class LoginForm(AuthenticationForm):
@@ -108,7 +110,7 @@ class FacilityForm(forms.ModelForm):
         fields = [
             "name", "sport_name", "location", "description",
             "slot_length_minutes", "open_time", "close_time",
-            "base_price", "image",
+            "base_price", "timezone", "image",
         ]
         widgets = {
             "name": forms.TextInput(attrs={"class": "form-control"}),
@@ -118,6 +120,7 @@ class FacilityForm(forms.ModelForm):
             "open_time": forms.TimeInput(attrs={"type": "time", "class": "form-control"}),
             "close_time": forms.TimeInput(attrs={"type": "time", "class": "form-control"}),
             "base_price": forms.NumberInput(attrs={"class": "form-control"}),
+            "timezone": forms.Select(attrs={"class": "form-select"}),
             "image": forms.ClearableFileInput(attrs={"class": "form-control"}),
         }
 
@@ -128,6 +131,7 @@ class FacilityForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if getattr(self.instance, "sport_text", ""):
             self.fields["sport_name"].initial = self.instance.sport_text
+        self.fields["timezone"].widget.choices = [(tz, tz) for tz in sorted(available_timezones())]
 
     def save(self, commit=True):
         obj = super().save(commit=False)
@@ -162,3 +166,32 @@ class BlackoutForm(forms.ModelForm):
             "note": forms.Textarea(
                 attrs={"class": "form-control", "rows": 2, "placeholder": "Reason / notice users will see (optional)"}),
         }
+
+
+class WaitlistForm(forms.ModelForm):
+    court = forms.ModelChoiceField(queryset=Court.objects.none(), required=False, empty_label="Any court")
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ["court", "start_dt", "end_dt", "auto_book"]
+        labels = {
+            "start_dt": "From",
+            "end_dt": "Until",
+            "auto_book": "Book automatically when a slot opens",
+        }
+        widgets = {
+            "start_dt": forms.DateTimeInput(attrs={"type": "datetime-local", "class": "form-control"}),
+            "end_dt": forms.DateTimeInput(attrs={"type": "datetime-local", "class": "form-control"}),
+        }
+
+    def __init__(self, *args, facility=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if facility is not None:
+            self.fields["court"].queryset = facility.courts.filter(is_active=True)
+
+    def clean(self):
+        cleaned = super().clean()
+        start, end = cleaned.get("start_dt"), cleaned.get("end_dt")
+        if start and end and start >= end:
+            raise forms.ValidationError("End must be after start.")
+        return cleaned
@@ -0,0 +1,29 @@
+from django.db.models import BooleanField, F, Value
+
+from .models import Booking, BookingArchive
+
+HISTORY_FIELDS = (
+    "id", "user_id", "facility_id", "court_id", "start_dt", "end_dt", "price", "status", "created_at", "version",
+)
+
+
+def _history_values(queryset, archived):
+    return queryset.annotate(
+        facility_name=F("facility__name"),
+        facility_timezone=F("facility__timezone"),
+        court_name=F("court__name"),
+        username=F("user__username"),
+        user_email=F("user__email"),
+        archived=Value(archived, output_field=BooleanField()),
+    ).values(*HISTORY_FIELDS, "facility_name", "facility_timezone", "court_name", "username", "user_email", "archived")
+
+
+def booking_history(*args, **filters):
+    """Live and archived bookings matching the filters, as one UNION ALL of value dicts.
+
+    Filters are applied to both tables, so they may only use fields the two
+    models share. The result can be ordered and sliced like any union.
+    """
+    return _history_values(Booking.objects.filter(*args, **filters), False).union(
+        _history_values(BookingArchive.objects.filter(*args, **filters), True), all=True
+    )
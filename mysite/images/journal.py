@@ -0,0 +1,92 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import occupancy
+from .caching import touch_facility
+from .models import ChangeEvent, EventCursor, Facility
+
+BATCH_SIZE = 500
+# Events younger than this are left for the next read, so a transaction that
+# took a lower id but commits a little later isn't skipped over.
+SETTLE_SECONDS = 2
+
+CONSUMERS = {}
+
+
+def consumer(name):
+    """Register a function that takes a batch of ChangeEvents, oldest first."""
+    def register(func):
+        CONSUMERS[name] = func
+        return func
+    return register
+
+
+def consume(name, batch=BATCH_SIZE, now=None):
+    """Hand the next batch of events past ``name``'s cursor to its consumer.
+
+    The consumer runs in the same transaction that advances the cursor, so
+    its database writes and the cursor commit together; if it raises,
+    neither does and the batch is delivered again. Returns the batch size.
+    """
+    handler = CONSUMERS[name]
+    cutoff = (now or timezone.now()) - timedelta(seconds=SETTLE_SECONDS)
+    with transaction.atomic():
+        cursor, _ = EventCursor.objects.select_for_update().get_or_create(name=name)
+        events = list(
+            ChangeEvent.objects.filter(pk__gt=cursor.last_id, created_at__lte=cutoff).order_by("pk")[:batch]
+        )
+        if not events:
+            return 0
+        handler(events)
+        cursor.last_id = events[-1].pk
+        cursor.save(update_fields=["last_id", "updated_at"])
+    return len(events)
+
+
+def prune():
+    """Delete the events every registered consumer has read. Returns how many."""
+    cursors = dict(EventCursor.objects.filter(name__in=CONSUMERS).values_list("name", "last_id"))
+    if set(cursors) != set(CONSUMERS):
+        return 0
+    upto = min(cursors.values())
+    oldest = ChangeEvent.objects.aggregate(first=Min("pk"))["first"]
+    if oldest is None or oldest > upto:
+        return 0
+    return ChangeEvent.objects.filter(pk__lte=upto).delete()[0]
+
+
+def _states(event):
+    """The event's row as written and, if it changed, as it was before."""
+    yield event.data
+    if "before" in event.data:
+        yield {**event.data, **event.data["before"]}
+
+
+@consumer("occupancy")
+def rebuild_occupancy(events):
+    """Recompute the occupancy rows of every court and day a booking or blackout event touched.
+
+    Writes refresh their own rows as they happen, so this only repairs rows
+    that drifted since (lost, restored or edited by hand) by rewriting them
+    from the source tables; cached pages are purged afterwards.
+    """
+    touched = defaultdict(lambda: (set(), []))
+    for event in events:
+        if event.kind == "court":
+            continue
+        for state in _states(event):
+            courts, spans = touched[state["facility_id"]]
+            courts.add(state.get("court_id") if event.kind == "booking" else None)
+            spans.append((parse_datetime(state["start_dt"]), parse_datetime(state["end_dt"])))
+    for facility in Facility.objects.filter(pk__in=touched):
+        courts, spans = touched[facility.pk]
+        # Rows of deleted courts went with them.
+        existing = set(facility.courts.filter(pk__in=courts).values_list("pk", flat=True)) | {None}
+        days = {day for start, end in spans for day in occupancy.span_days(start, end, facility.tzinfo)}
+        occupancy.refresh(facility, courts & existing, days)
+    touch_facility(*touched)
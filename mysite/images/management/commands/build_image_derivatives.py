@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from images.derivatives import build, needs_build
+from images.models import Facility
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG derivatives for facility images that don't have current ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild even if derivatives are current.")
+
+    def handle(self, *args, **options):
+        built = 0
+        for facility in Facility.objects.exclude(image="").exclude(image__isnull=True).order_by("pk"):
+            if not options["force"] and not needs_build(facility):
+                continue
+            try:
+                if build(facility):
+                    built += 1
+                    self.stdout.write(f"{facility.name}: {len(facility.image_variants['jpeg'])} sizes")
+            except (OSError, ValueError) as exc:
+                self.stderr.write(f"{facility.name}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {built} facilities."))
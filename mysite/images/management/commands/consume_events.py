@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from images import journal
+
+
+class Command(BaseCommand):
+    help = "Feed new ChangeEvents to each consumer in batches, from its stored cursor"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", action="append", dest="consumers", metavar="NAME",
+                            help="Run only this consumer (repeatable). Default: all registered.")
+        parser.add_argument("--batch", type=int, default=journal.BATCH_SIZE, help="Events per transaction.")
+        parser.add_argument("--follow", action="store_true", help="Keep polling for new events.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls with --follow.")
+        parser.add_argument("--prune", action="store_true",
+                            help="Afterwards delete the events every registered consumer has read.")
+
+    def handle(self, *args, **options):
+        names = options["consumers"] or sorted(journal.CONSUMERS)
+        unknown = set(names) - set(journal.CONSUMERS)
+        if unknown:
+            raise CommandError(f"Unknown consumer: {', '.join(sorted(unknown))}. "
+                               f"Registered: {', '.join(sorted(journal.CONSUMERS))}.")
+        totals = dict.fromkeys(names, 0)
+        try:
+            while True:
+                for name in names:
+                    while n := journal.consume(name, batch=options["batch"]):
+                        totals[name] += n
+                        self.stdout.write(f"{name}: {totals[name]} events...")
+                if not options["follow"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        for name, n in totals.items():
+            self.stdout.write(self.style.SUCCESS(f"{name}: consumed {n} events."))
+        if options["prune"]:
+            self.stdout.write(self.style.SUCCESS(f"Pruned {journal.prune()} events."))
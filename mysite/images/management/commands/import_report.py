@@ -0,0 +1,98 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+STARTUP = "import django; django.setup()"
+URLS = "from django.urls import get_resolver; get_resolver().url_patterns"
+COMMAND = (
+    "from django.core.management import get_commands, load_command_class; "
+    "load_command_class(get_commands()[{name!r}], {name!r})"
+)
+
+
+def parse(stderr):
+    """``-X importtime`` output as (module, self µs, cumulative µs, direct children) rows."""
+    rows, pending = [], defaultdict(list)
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, indent, module = match.groups()
+        depth = len(indent) // 2
+        # Children are printed before their parent, one level deeper.
+        row = (module, int(self_us), int(cumulative), pending.pop(depth + 1, []))
+        pending[depth].append(row)
+        rows.append(row)
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Report what Python imports cost at startup, broken down per project module"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--urls", action="store_true",
+                            help="Also load the URLconf and every view module, as the first request does.")
+        parser.add_argument("--command", help="Also load this management command's module.")
+        parser.add_argument("--runs", type=int, default=3, help="Measure this many times and keep the fastest.")
+        parser.add_argument("--limit", type=int, default=15, help="Rows per section.")
+
+    def handle(self, *args, **options):
+        code = [STARTUP]
+        if options["urls"]:
+            code.append(URLS)
+        if options["command"]:
+            code.append(COMMAND.format(name=options["command"]))
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "mysite.settings")}
+
+        best = None
+        for _ in range(max(1, options["runs"])):
+            started = time.monotonic()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", "; ".join(code)],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            elapsed = time.monotonic() - started
+            if proc.returncode:
+                raise CommandError(proc.stderr.strip().splitlines()[-1])
+            if best is None or elapsed < best[0]:
+                best = (elapsed, parse(proc.stderr))
+        elapsed, rows = best
+
+        local = {
+            app.name.split(".")[0] for app in apps.get_app_configs()
+            if Path(app.path).is_relative_to(settings.BASE_DIR)
+        } | {settings.ROOT_URLCONF.split(".")[0]}
+        is_local = lambda module: module.split(".")[0] in local  # noqa: E731
+        limit = options["limit"]
+
+        self.stdout.write(
+            f"Process: {elapsed * 1000:.0f} ms wall, {sum(r[1] for r in rows) / 1000:.0f} ms importing "
+            f"{len(rows)} modules."
+        )
+
+        by_package = defaultdict(int)
+        for module, self_us, _, _ in rows:
+            by_package[module.split(".")[0]] += self_us
+        self.stdout.write("\nSelf time by top-level package:")
+        for package, us in sorted(by_package.items(), key=lambda item: -item[1])[:limit]:
+            self.stdout.write(f"  {us / 1000:8.1f} ms  {package}")
+
+        self.stdout.write("\nProject modules by cumulative time, with the heaviest imports they pulled in:")
+        for module, self_us, cumulative, children in sorted(
+                (r for r in rows if is_local(r[0])), key=lambda r: -r[2])[:limit]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {module} ({self_us / 1000:.1f} ms self)")
+            for child, _, child_cumulative, _ in sorted(
+                    (c for c in children if not is_local(c[0])), key=lambda c: -c[2])[:3]:
+                if child_cumulative >= 1000:
+                    self.stdout.write(f"  {'':11}{child_cumulative / 1000:6.1f} ms  <- {child}")
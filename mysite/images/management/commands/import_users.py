@@ -0,0 +1,143 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import chain, islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from images.models import UserProfile
+
+ROLES = {value for value, _ in UserProfile.ROLE_CHOICES}
+# Below this many rows starting the workers (and django.setup() in each, when
+# spawned) costs more than it saves, so passwords are hashed in-process.
+POOL_MIN_ROWS = 200
+
+
+def _init_worker(settings_module):
+    # Needed when workers are spawned rather than forked; a no-op otherwise.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def _hash(password):
+    # An empty password gets an unusable hash, like set_unusable_password().
+    return make_password(password or None)
+
+
+class Command(BaseCommand):
+    help = "Import users from CSV (username,email,password[,first_name,last_name,phone,role])"
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file", help="Path to the CSV file, with a header row.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                            help="Processes hashing passwords (default: one per CPU).")
+        parser.add_argument("--batch", type=int, default=2_000, help="Users hashed and inserted per batch.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        self.imported, self.skipped, self.insert_time = 0, 0, 0.0
+        self.seen = set()
+        try:
+            fh = open(options["csv_file"], newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise CommandError(e)
+
+        with fh:
+            reader = csv.DictReader(fh)
+            missing = {"username", "password"} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Missing column(s): {', '.join(sorted(missing))}")
+            # Line numbers are taken as each row is read, since rows are read ahead.
+            rows = ((reader.line_num, row) for row in reader)
+            head = list(islice(rows, POOL_MIN_ROWS))
+            rows = chain(head, rows)
+            pool = ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=_init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "mysite.settings"),),
+            ) if options["workers"] > 1 and len(head) == POOL_MIN_ROWS else None
+
+            with pool or nullcontext():
+                # While one batch is written to the database the pool hashes the next.
+                pending = None
+                for chunk in iter(lambda: list(islice(rows, options["batch"])), []):
+                    batch = self._clean(chunk)
+                    if not batch:
+                        continue
+                    passwords = [row["password"] for row in batch]
+                    if pool:
+                        chunksize = max(1, len(batch) // (options["workers"] * 4))
+                        hashed = pool.map(_hash, passwords, chunksize=chunksize)
+                    else:
+                        hashed = [_hash(password) for password in passwords]
+                    if pending:
+                        self._insert(*pending)
+                    pending = (batch, hashed)
+                if pending:
+                    self._insert(*pending)
+
+        elapsed = time.monotonic() - started
+        hashers = f"{options['workers']} workers" if pool else "in-process hashing"
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.imported} users ({self.skipped} skipped) in {elapsed:.1f}s: "
+            f"{self.imported / elapsed if elapsed else 0:.0f} users/s with {hashers}, "
+            f"{self.insert_time:.1f}s spent inserting."
+        ))
+
+    def _clean(self, rows):
+        batch = []
+        for line, row in rows:
+            username = (row.get("username") or "").strip()
+            role = (row.get("role") or "").strip() or "customer"
+            if not username or username in self.seen or role not in ROLES:
+                reason = "duplicate username" if username in self.seen else (
+                    f"unknown role {role!r}" if username else "no username")
+                self.stderr.write(f"Line {line}: skipped, {reason}.")
+                self.skipped += 1
+                continue
+            self.seen.add(username)
+            row.update(username=username, role=role)
+            batch.append(row)
+        if not batch:
+            return batch
+        existing = set(User.objects.filter(username__in=[r["username"] for r in batch])
+                       .values_list("username", flat=True))
+        if existing:
+            self.skipped += len(existing)
+            self.stderr.write(f"Skipped {len(existing)} existing user(s), e.g. {min(existing)!r}.")
+        return [r for r in batch if r["username"] not in existing]
+
+    def _insert(self, batch, hashed):
+        users = [
+            User(
+                username=row["username"],
+                email=User.objects.normalize_email((row.get("email") or "").strip()),
+                first_name=(row.get("first_name") or "").strip(),
+                last_name=(row.get("last_name") or "").strip(),
+                password=password,
+            )
+            for row, password in zip(batch, hashed)
+        ]
+        started = time.monotonic()
+        # bulk_create doesn't send post_save, so create_profile doesn't run; the
+        # profiles are inserted here instead, with the same defaults for blank
+        # columns (no phone, the customer role).
+        with transaction.atomic():
+            users = User.objects.bulk_create(users)
+            if any(u.pk is None for u in users):
+                ids = dict(User.objects.filter(username__in=[u.username for u in users])
+                           .values_list("username", "pk"))
+                for u in users:
+                    u.pk = ids[u.username]
+            UserProfile.objects.bulk_create([
+                UserProfile(user=u, phone=(row.get("phone") or "").strip(), role=row["role"])
+                for u, row in zip(users, batch)
+            ])
+        self.insert_time += time.monotonic() - started
+        self.imported += len(users)
+        self.stdout.write(f"Imported {self.imported} users...")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from images.waitlist import expire_holds, expire_waiting
+
+
+class Command(BaseCommand):
+    help = "Expire lapsed waitlist holds and offer each slot to the next waiter"
+
+    def handle(self, *args, **options):
+        expired = expire_holds()
+        stale = expire_waiting()
+        self.stdout.write(self.style.SUCCESS(f"Expired {expired} waitlist holds and {stale} past waiting entries."))
@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from images.models import Facility
+from images.occupancy import reconcile
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or with --verify, just check) occupancy bitsets against bookings and blackouts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true", help="Report differences without writing.")
+        parser.add_argument("--facility", type=int, action="append", help="Limit to these facility ids.")
+        parser.add_argument("--since", type=date.fromisoformat, help="First day to reconcile (default: today).")
+
+    def handle(self, *args, **options):
+        facilities = Facility.objects.annotate(
+            last_booking=Max("bookings__end_dt"), last_blackout=Max("blackouts__end_dt"),
+        ).order_by("pk")
+        if options["facility"]:
+            facilities = facilities.filter(pk__in=options["facility"])
+
+        total = 0
+        for facility in facilities:
+            tz = facility.tzinfo
+            first = options["since"] or timezone.localdate(timezone=tz)
+            ends = [dt for dt in (facility.last_booking, facility.last_blackout) if dt]
+            last = max([timezone.localdate(dt, tz) for dt in ends] + [first + timedelta(days=1)])
+            stale = reconcile(facility, first, last, apply=not options["verify"])
+            total += len(stale)
+            for court_id, day in stale:
+                self.stdout.write(f"{facility.name}: {day} {'court ' + str(court_id) if court_id else 'facility'}")
+
+        verb = "differ" if options["verify"] else "rewritten"
+        style = self.style.WARNING if total and options["verify"] else self.style.SUCCESS
+        self.stdout.write(style(f"{total} occupancy rows {verb}."))
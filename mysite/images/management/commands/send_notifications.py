@@ -0,0 +1,31 @@
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from images.models import Notification
+
+
+class Command(BaseCommand):
+    help = "Send queued notifications in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=200)
+
+    def handle(self, *args, **options):
+        sent = 0
+        connection = get_connection(fail_silently=True)
+        while True:
+            batch = list(
+                Notification.objects.filter(sent_at__isnull=True)
+                .select_related("user")
+                .order_by("id")[:options["batch"]]
+            )
+            if not batch:
+                break
+            connection.send_messages([
+                EmailMessage(n.subject, n.body, "noreply@example.com", [n.user.email])
+                for n in batch if n.user.email
+            ])
+            Notification.objects.filter(pk__in=[n.pk for n in batch]).update(sent_at=timezone.now())
+            sent += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} notifications."))
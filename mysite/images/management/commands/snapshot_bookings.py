@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from images.snapshot import snapshot_dir, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Export bookings into the columnar, memory-mappable analytics snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="Snapshot directory (default: settings.BOOKING_SNAPSHOT_DIR).")
+        parser.add_argument("--full", action="store_true",
+                            help="Rebuild from scratch instead of appending bookings newer than the last "
+                                 "export. Appends only refresh rows that hadn't started at the last export.")
+        parser.add_argument("--chunk", type=int, default=50_000, help="Rows read and written per batch.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        appended, total = write_snapshot(
+            options["path"], full=options["full"], chunk=options["chunk"], log=self.stdout.write,
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Appended {appended} bookings to {snapshot_dir(options['path'])} ({total} total) in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0006_alter_facility_sport_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blackout',
+            index=models.Index(fields=['facility', 'end_dt'], name='images_blac_facilit_899cf1_idx'),
+        ),
+    ]
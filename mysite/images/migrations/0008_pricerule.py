@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0007_blackout_facility_end_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(blank=True, max_length=60)),
+                ('weekdays', models.CharField(default='0123456', help_text='Days the rule applies to, Monday=0.', max_length=7)),
+                ('start_time', models.TimeField(blank=True, null=True)),
+                ('end_time', models.TimeField(blank=True, null=True)),
+                ('price_per_hour', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('priority', models.IntegerField(default=0)),
+                ('court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='images.court')),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='images.facility')),
+                ('sport', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='images.sport')),
+            ],
+            options={
+                'ordering': ['facility__name', '-priority', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0008_pricerule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Occupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('grid', models.CharField(max_length=64)),
+                ('booked', models.BinaryField(default=bytes)),
+                ('blocked', models.BinaryField(default=bytes)),
+                ('court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='images.court')),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='images.facility')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['facility', 'date'], name='images_occu_facilit_5fa40b_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('court__isnull', False)), fields=('court', 'date'), name='occupancy_court_day'), models.UniqueConstraint(condition=models.Q(('court__isnull', True)), fields=('facility', 'date'), name='occupancy_facility_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0009_occupancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_dt', models.DateTimeField()),
+                ('end_dt', models.DateTimeField()),
+                ('auto_book', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('held', 'Held'), ('booked', 'Booked'), ('expired', 'Expired'), ('cancelled', 'Cancelled')], default='waiting', max_length=10)),
+                ('held_start', models.DateTimeField(blank=True, null=True)),
+                ('held_end', models.DateTimeField(blank=True, null=True)),
+                ('hold_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='images.booking')),
+                ('court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='images.court')),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='images.facility')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['facility', 'status', 'start_dt', 'created_at'], name='images_wait_facilit_fc1fbe_idx'), models.Index(fields=['status', 'hold_expires_at'], name='images_wait_status_0dea62_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0010_waitlistentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_dt', models.DateTimeField()),
+                ('end_dt', models.DateTimeField()),
+                ('price', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('status', models.CharField(choices=[('confirmed', 'Confirmed'), ('cancelled', 'Cancelled')], default='confirmed', max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='images.court')),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='images.facility')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'start_dt'], name='images_book_user_id_ce9c7f_idx'), models.Index(fields=['facility', 'start_dt'], name='images_book_facilit_2df704_idx')],
+            },
+        ),
+    ]
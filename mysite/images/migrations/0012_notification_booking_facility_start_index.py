@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0011_bookingarchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=200)),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['facility', 'start_dt'], name='images_book_facilit_e4e2e6_idx'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['sent_at', 'id'], name='images_noti_sent_at_5aac64_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:15
+
+import images.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0012_notification_booking_facility_start_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='timezone',
+            field=models.CharField(default='UTC', max_length=64, validators=[images.models.validate_timezone]),
+        ),
+    ]
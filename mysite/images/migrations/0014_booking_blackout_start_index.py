@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0013_facility_timezone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blackout',
+            index=models.Index(fields=['start_dt'], name='images_blac_start_d_29f4f9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['start_dt'], name='images_book_start_d_b9a503_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0014_booking_blackout_start_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facility',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:51
+
+import django.db.models.deletion
+import images.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0015_facility_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Schedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('hours', models.CharField(blank=True, help_text='Open intervals, e.g. 08:00-12:00, 13:00-22:00. Empty means closed.', max_length=200, validators=[images.models.validate_hours])),
+                ('slot_length_minutes', models.PositiveIntegerField(blank=True, help_text="Defaults to the facility's slot length.", null=True)),
+                ('court', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='images.court')),
+                ('facility', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='images.facility')),
+            ],
+            options={
+                'ordering': ['facility__name', 'court__name', 'weekday'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('court__isnull', False)), fields=('court', 'weekday'), name='schedule_court_weekday'), models.UniqueConstraint(condition=models.Q(('court__isnull', True)), fields=('facility', 'weekday'), name='schedule_facility_weekday')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:58
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0016_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('booking', 'Booking'), ('blackout', 'Blackout'), ('court', 'Court')], max_length=10)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('facility_id', models.BigIntegerField()),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'object_id'], name='images_chan_kind_1fe067_idx')],
+            },
+        ),
+    ]
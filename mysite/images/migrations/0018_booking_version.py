@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0017_eventcursor_changeevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='bookingarchive',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
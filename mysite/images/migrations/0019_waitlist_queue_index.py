@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 02:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0018_booking_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='waitlistentry',
+            name='images_wait_facilit_fc1fbe_idx',
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['facility', 'status', 'created_at'], name='waitlist_queue'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('images', '0019_waitlist_queue_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='bookingarchive',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -1,13 +1,47 @@
-from datetime import timedelta, time as dtime, datetime
+from datetime import time as dtime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 
+def validate_timezone(value):
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"Unknown time zone: {value}")
+
+
+def parse_hours(value):
+    """Open intervals such as "08:00-12:00, 13:00-22:00" as sorted (open, close) minutes."""
+    intervals = []
+    for part in filter(None, (p.strip() for p in (value or "").split(","))):
+        try:
+            opens, closes = (dtime.fromisoformat(t.strip()) for t in part.split("-"))
+        except ValueError:
+            raise ValueError(f"Use HH:MM-HH:MM, not {part!r}.")
+        intervals.append((opens.hour * 60 + opens.minute, closes.hour * 60 + closes.minute))
+    intervals.sort()
+    for (o1, c1), (o2, _) in zip(intervals, intervals[1:]):
+        if o2 < c1:
+            raise ValueError("Open intervals must not overlap.")
+    if any(o >= c for o, c in intervals):
+        raise ValueError("Each interval must close after it opens.")
+    return tuple(intervals)
+
+
+def validate_hours(value):
+    try:
+        parse_hours(value)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
 class Facility(models.Model):
     SPORT_CHOICES = [
         ("tennis", "Tennis"),
@@ -36,14 +70,46 @@ class Facility(models.Model):
     location = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     image = models.ImageField(upload_to="facility_images/", blank=True, null=True)
+    # Resized copies of ``image`` written by images.derivatives; see ``image_srcset``.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     slot_length_minutes = models.PositiveIntegerField(default=60)
     open_time = models.TimeField(default=dtime(8, 0))
     close_time = models.TimeField(default=dtime(22, 0))
     base_price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    timezone = models.CharField(max_length=64, default="UTC", validators=[validate_timezone])
 
     def __str__(self):
         return self.name
 
+    @property
+    def tzinfo(self):
+        return ZoneInfo(self.timezone)
+
+    def _image_variants(self, fmt):
+        # Variants built for an earlier upload are ignored until rebuilt.
+        if not self.image or self.image_variants.get("source") != self.image.name:
+            return []
+        return [(self.image.storage.url(name), width) for name, width in self.image_variants.get(fmt, [])]
+
+    def image_srcset(self, fmt):
+        return ", ".join(f"{url} {width}w" for url, width in self._image_variants(fmt))
+
+    @property
+    def image_webp_srcset(self):
+        return self.image_srcset("webp")
+
+    @property
+    def image_jpeg_srcset(self):
+        return self.image_srcset("jpeg")
+
+    @property
+    def image_fallback_url(self):
+        """The mid-size JPEG derivative, or the original until derivatives exist."""
+        variants = self._image_variants("jpeg")
+        if variants:
+            return variants[len(variants) // 2][0]
+        return self.image.url if self.image else ""
+
     @property
     def display_sport(self) -> str:
         court = self.courts.filter(sport__isnull=False).select_related("sport").first()
@@ -66,7 +132,48 @@ class Sport(models.Model):
         return self.name
 
 
-class Court(models.Model):
+class JournaledModel(models.Model):
+    """Appends a ChangeEvent in the same transaction as every save.
+
+    Deletes, cascades included, are journaled by a ``post_delete`` receiver,
+    which Django runs inside the delete's own transaction. Bulk ``update()``
+    calls bypass both and must call ``ChangeEvent.record`` themselves.
+    """
+
+    # Attributes copied into each event, with their loaded values under "before" when they changed.
+    JOURNAL_FIELDS = ()
+
+    class Meta:
+        abstract = True
+
+    def event_data(self):
+        data = {name: getattr(self, name) for name in self.JOURNAL_FIELDS}
+        loaded = getattr(self, "_loaded", None) or {}
+        before = {name: loaded[name] for name in self.JOURNAL_FIELDS if name in loaded and loaded[name] != data[name]}
+        if before:
+            data["before"] = before
+        return data
+
+    def journal_event(self, action, data=None):
+        return ChangeEvent(
+            kind=self._meta.model_name, action=action, object_id=self.pk, facility_id=self.facility_id,
+            data=self.event_data() if data is None else data,
+        )
+
+    def save(self, *args, **kwargs):
+        action = "created" if self._state.adding else "updated"
+        data = self.event_data()
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            self.journal_event(action, data).save(using=self._state.db)
+        if getattr(self, "_loaded", None):
+            # The next save's "before" is this save's result.
+            self._loaded = {name: getattr(self, name) for name in self._loaded}
+
+
+class Court(JournaledModel):
+    JOURNAL_FIELDS = ("name", "is_active", "sport_id")
+
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="courts")
     name = models.CharField(max_length=50)
     is_active = models.BooleanField(default=True)
@@ -80,8 +187,9 @@ class Court(models.Model):
         return f"{self.facility.name} - {self.name}"
 
 
-class Booking(models.Model):
+class Booking(JournaledModel):
     STATUS = [("confirmed", "Confirmed"), ("cancelled", "Cancelled")]
+    JOURNAL_FIELDS = ("facility_id", "court_id", "start_dt", "end_dt", "status")
 
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="bookings")
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="bookings")
@@ -91,50 +199,288 @@ class Booking(models.Model):
     price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
     status = models.CharField(max_length=10, choices=STATUS, default="confirmed")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by save() and booking_updates' conditional UPDATEs, never by a form: booking_updates only
+    # changes the row at the version its caller read.
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["facility", "start_dt"]),
+            models.Index(fields=["start_dt"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded = dict(zip(field_names, values))
+        return instance
 
     def __str__(self):
         target = self.court.name if self.court_id else self.facility.name
         return f"{target} • {self.start_dt:%Y-%m-%d %H:%M}"
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+
     def clean(self):
-        if not self.facility_id:
-            raise ValidationError("Facility must be set.")
-        if self.court_id and self.court.facility_id != self.facility_id:
-            raise ValidationError("Selected court doesn't belong to the chosen facility.")
-        if not self.start_dt or not self.end_dt:
-            raise ValidationError("Start and end time are required.")
-        if self.start_dt >= self.end_dt:
-            raise ValidationError("End time must be after start time.")
-        minutes = int((self.end_dt - self.start_dt).total_seconds() // 60)
-        if minutes <= 0 or minutes % self.facility.slot_length_minutes != 0:
-            raise ValidationError("Booking length must be a positive multiple of the facility slot length.")
-        local_start = timezone.localtime(self.start_dt)
-        local_end = timezone.localtime(self.end_dt)
-        if not (self.facility.open_time <= local_start.time() and local_end.time() <= self.facility.close_time):
-            raise ValidationError("Booking must be within facility opening hours.")
-        if (self.start_dt - timezone.now()) < timedelta(hours=1):
-            raise ValidationError("Bookings must be made at least 1 hour in advance.")
-        if Blackout.objects.filter(facility=self.facility, start_dt__lt=self.end_dt, end_dt__gt=self.start_dt).exists():
-            raise ValidationError("This time falls within a blackout period.")
-        qs = Booking.objects.filter(status="confirmed")
-        if self.pk:
-            qs = qs.exclude(pk=self.pk)
-        qs = qs.filter(court=self.court) if self.court_id else qs.filter(facility=self.facility)
-        if qs.filter(start_dt__lt=self.end_dt, end_dt__gt=self.start_dt).exists():
-            raise ValidationError("This time overlaps with another booking.")
-
-
-class Blackout(models.Model):
+        from .validation import validate_booking
+
+        errors = validate_booking(self)
+        if errors:
+            raise ValidationError(errors)
+
+
+class BookingArchive(models.Model):
+    """Past and cancelled bookings moved out of the live Booking table by ``archive_bookings``."""
+
+    STATUS = Booking.STATUS
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_bookings")
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="archived_bookings")
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, related_name="archived_bookings", null=True, blank=True)
+    start_dt = models.DateTimeField()
+    end_dt = models.DateTimeField()
+    price = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    status = models.CharField(max_length=10, choices=STATUS, default="confirmed")
+    created_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1, editable=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "start_dt"]),
+            models.Index(fields=["facility", "start_dt"]),
+        ]
+
+    def __str__(self):
+        return f"{self.facility.name} • {self.start_dt:%Y-%m-%d %H:%M} (archived)"
+
+
+class Blackout(JournaledModel):
+    JOURNAL_FIELDS = ("facility_id", "start_dt", "end_dt")
+
     facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="blackouts")
     start_dt = models.DateTimeField()
     end_dt = models.DateTimeField()
     note = models.CharField(max_length=200, blank=True)
     reason = models.CharField(max_length=200, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["facility", "end_dt"]),
+            models.Index(fields=["start_dt"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded = dict(zip(field_names, values))
+        return instance
+
     def __str__(self):
         return f"{self.facility.name} blackout {self.start_dt:%Y-%m-%d %H:%M}–{self.end_dt:%H:%M}"
 
 
+class PriceRule(models.Model):
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="price_rules")
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, null=True, blank=True, related_name="price_rules")
+    sport = models.ForeignKey(Sport, on_delete=models.CASCADE, null=True, blank=True, related_name="price_rules")
+    label = models.CharField(max_length=60, blank=True)
+    weekdays = models.CharField(max_length=7, default="0123456", help_text="Days the rule applies to, Monday=0.")
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    price_per_hour = models.DecimalField(max_digits=8, decimal_places=2)
+    priority = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["facility__name", "-priority", "id"]
+
+    def __str__(self):
+        return f"{self.facility.name} • {self.label or 'rule'} {self.price_per_hour}/h"
+
+    def clean(self):
+        if not self.weekdays or any(d not in "0123456" for d in self.weekdays):
+            raise ValidationError("Weekdays must be digits 0 (Monday) to 6 (Sunday).")
+        if self.start_time and self.end_time and self.start_time >= self.end_time:
+            raise ValidationError("End time must be after start time.")
+        if self.court_id and self.court.facility_id != self.facility_id:
+            raise ValidationError("Selected court doesn't belong to the chosen facility.")
+
+    def applies_to(self, weekday, minute):
+        if str(weekday) not in self.weekdays:
+            return False
+        if self.start_time and minute < self.start_time.hour * 60 + self.start_time.minute:
+            return False
+        if self.end_time and minute >= self.end_time.hour * 60 + self.end_time.minute:
+            return False
+        return True
+
+
+class Schedule(models.Model):
+    """Opening hours of a facility, or of one of its courts, on one weekday.
+
+    ``hours`` lists the open intervals; empty means closed all day. A court
+    without a schedule for the day follows its facility's, and a facility
+    without one follows ``open_time``/``close_time``. See images.schedules.
+    """
+
+    WEEKDAYS = [(0, "Monday"), (1, "Tuesday"), (2, "Wednesday"), (3, "Thursday"), (4, "Friday"),
+                (5, "Saturday"), (6, "Sunday")]
+
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="schedules")
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, null=True, blank=True, related_name="schedules")
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS)
+    hours = models.CharField(max_length=200, blank=True, validators=[validate_hours],
+                             help_text="Open intervals, e.g. 08:00-12:00, 13:00-22:00. Empty means closed.")
+    slot_length_minutes = models.PositiveIntegerField(null=True, blank=True,
+                                                      help_text="Defaults to the facility's slot length.")
+
+    class Meta:
+        ordering = ["facility__name", "court__name", "weekday"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["court", "weekday"], condition=models.Q(court__isnull=False), name="schedule_court_weekday"
+            ),
+            models.UniqueConstraint(
+                fields=["facility", "weekday"], condition=models.Q(court__isnull=True),
+                name="schedule_facility_weekday"
+            ),
+        ]
+
+    def __str__(self):
+        target = self.court.name if self.court_id else self.facility.name
+        return f"{target} • {self.get_weekday_display()} {self.hours or 'closed'}"
+
+    def clean(self):
+        if self.court_id and self.court.facility_id != self.facility_id:
+            raise ValidationError("Selected court doesn't belong to the chosen facility.")
+        if self.slot_length_minutes == 0:
+            raise ValidationError("Slot length must be positive.")
+
+
+class WaitlistEntry(models.Model):
+    STATUS = [
+        ("waiting", "Waiting"),
+        ("held", "Held"),
+        ("booked", "Booked"),
+        ("expired", "Expired"),
+        ("cancelled", "Cancelled"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="waitlist_entries")
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="waitlist_entries")
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, null=True, blank=True, related_name="waitlist_entries")
+    start_dt = models.DateTimeField()
+    end_dt = models.DateTimeField()
+    auto_book = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS, default="waiting")
+    held_start = models.DateTimeField(null=True, blank=True)
+    held_end = models.DateTimeField(null=True, blank=True)
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+    booking = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Waiters in queue order; expire_waiting moves past windows out of the "waiting" range.
+            models.Index(fields=["facility", "status", "created_at"], name="waitlist_queue"),
+            models.Index(fields=["status", "hold_expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user} waiting for {self.court or self.facility} {self.start_dt:%Y-%m-%d %H:%M}"
+
+
+class Notification(models.Model):
+    """Outbox of emails to users, drained by ``send_notifications``."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="notifications")
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["sent_at", "id"])]
+
+    def __str__(self):
+        return f"{self.subject} → {self.user}"
+
+
+class Occupancy(models.Model):
+    """Denormalized bitset of taken slots for one court (or facility) and day.
+
+    Bit ``i`` is slot ``i`` of the day's slot grid; ``grid`` records which
+    grid the bits were laid out against, so rows go stale when hours change.
+    Refreshed in the transaction of every booking and blackout write; the
+    "occupancy" ``consume_events`` consumer and ``rebuild_occupancy`` repair
+    anything written around those paths.
+    """
+
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="occupancy")
+    court = models.ForeignKey(Court, on_delete=models.CASCADE, null=True, blank=True, related_name="occupancy")
+    date = models.DateField()
+    grid = models.CharField(max_length=64)
+    booked = models.BinaryField(default=bytes)
+    blocked = models.BinaryField(default=bytes)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["court", "date"], condition=models.Q(court__isnull=False), name="occupancy_court_day"
+            ),
+            models.UniqueConstraint(
+                fields=["facility", "date"], condition=models.Q(court__isnull=True), name="occupancy_facility_day"
+            ),
+        ]
+        indexes = [models.Index(fields=["facility", "date"])]
+
+    def __str__(self):
+        return f"{self.court or self.facility} occupancy {self.date}"
+
+
+class ChangeEvent(models.Model):
+    """Append-only journal of Booking, Blackout and Court changes, read by ``consume_events``."""
+
+    KINDS = [("booking", "Booking"), ("blackout", "Blackout"), ("court", "Court")]
+    ACTIONS = [("created", "Created"), ("updated", "Updated"), ("deleted", "Deleted")]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    # Plain ids, not foreign keys: events outlive the rows they describe.
+    object_id = models.BigIntegerField()
+    facility_id = models.BigIntegerField()
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["kind", "object_id"])]
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.object_id} {self.action}"
+
+    @classmethod
+    def record(cls, instances, action):
+        """Journal ``instances``; call it inside the transaction that changed them."""
+        return cls.objects.bulk_create([instance.journal_event(action) for instance in instances])
+
+
+class EventCursor(models.Model):
+    """How far a ``consume_events`` consumer has read the ChangeEvent journal."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at #{self.last_id}"
+
+
 class UserProfile(models.Model):
     ROLE_CHOICES = [("customer", "Customer"), ("provider", "Provider")]
 
@@ -0,0 +1,236 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Blackout, Booking, Facility, Occupancy
+from .schedules import grid_for
+from .services import day_bounds, facility_blackouts, generate_slots
+
+EMPTY = (0, 0)
+
+
+def grid_signature(facility, court_id, date):
+    return f"{grid_for(facility, court_id, date.weekday()).signature}@{facility.timezone}"
+
+
+def to_bits(data):
+    return int.from_bytes(bytes(data or b""), "little")
+
+
+def to_bytes(bits):
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def span_days(start, end, tz):
+    day, last = timezone.localdate(start, tz), timezone.localdate(end - timedelta(microseconds=1), tz)
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def _spans_to_bits(slots, spans):
+    bits = 0
+    for i, (s, e) in enumerate(slots):
+        if any(s < se and e > ss for ss, se in spans):
+            bits |= 1 << i
+    return bits
+
+
+def _target_filter(court_ids):
+    q = Q(court_id__in=[c for c in court_ids if c is not None])
+    if None in court_ids:
+        q |= Q(court__isnull=True)
+    return q
+
+
+def _source_bits(facility, first, last, court_ids=None):
+    """(court_id, date) -> (booked, blocked) bits computed from Booking and Blackout."""
+    tz = facility.tzinfo
+    lo, hi = day_bounds(first, tz)[0], day_bounds(last, tz)[1]
+    bookings = Booking.objects.filter(facility=facility, status="confirmed", start_dt__lt=hi, end_dt__gt=lo)
+    if court_ids is not None:
+        bookings = bookings.filter(_target_filter(court_ids))
+    booked, blocked = defaultdict(list), defaultdict(list)
+    for court_id, s, e in bookings.values_list("court_id", "start_dt", "end_dt"):
+        for day in span_days(s, e, tz):
+            booked[(court_id, day)].append((s, e))
+    if court_ids is None or None in court_ids:
+        for s, e in Blackout.objects.filter(facility=facility, start_dt__lt=hi, end_dt__gt=lo).values_list(
+                "start_dt", "end_dt"):
+            for day in span_days(s, e, tz):
+                blocked[(None, day)].append((s, e))
+
+    result = {}
+    for key in set(booked) | set(blocked):
+        if not first <= key[1] <= last:
+            continue
+        slots = generate_slots(facility, key[1], key[0])
+        bits = (_spans_to_bits(slots, booked[key]), _spans_to_bits(slots, blocked[key]))
+        if bits != EMPTY:
+            result[key] = bits
+    return result
+
+
+def _existing(facility, days, court_ids=None):
+    qs = Occupancy.objects.filter(facility=facility, date__in=days)
+    if court_ids is not None:
+        qs = qs.filter(_target_filter(court_ids))
+    return {(o.court_id, o.date): o for o in qs}
+
+
+@transaction.atomic
+def _write(facility, keys, source, existing):
+    create, update, delete = [], [], []
+    for key in keys:
+        signature = grid_signature(facility, *key)
+        bits = source.get(key, EMPTY)
+        row = existing.get(key)
+        if bits == EMPTY:
+            if row is not None:
+                delete.append(row.pk)
+        elif row is None:
+            create.append(Occupancy(
+                facility=facility, court_id=key[0], date=key[1], grid=signature,
+                booked=to_bytes(bits[0]), blocked=to_bytes(bits[1]),
+            ))
+        elif row.grid != signature or (to_bits(row.booked), to_bits(row.blocked)) != bits:
+            row.grid, row.booked, row.blocked = signature, to_bytes(bits[0]), to_bytes(bits[1])
+            update.append(row)
+    if delete:
+        Occupancy.objects.filter(pk__in=delete).delete()
+    if update:
+        Occupancy.objects.bulk_update(update, ["grid", "booked", "blocked"])
+    if create:
+        Occupancy.objects.bulk_create(create)
+
+
+def refresh(facility, court_ids, days):
+    """Recompute the rows of ``court_ids`` (None is the facility row) on ``days``."""
+    days = sorted(set(days))
+    if not days:
+        return
+    court_ids = set(court_ids)
+    source = _source_bits(facility, days[0], days[-1], court_ids)
+    existing = _existing(facility, days, court_ids)
+    _write(facility, [(c, d) for c in court_ids for d in days], source, existing)
+
+
+def written_spans(instance):
+    """(facility_id, court_id, start, end) of a booking or blackout before and after its write.
+
+    Blackouts live on the facility row, so their court is None.
+    """
+    is_booking = isinstance(instance, Booking)
+    spans = [(instance.facility_id, instance.court_id if is_booking else None, instance.start_dt, instance.end_dt)]
+    loaded = getattr(instance, "_loaded", None) or {}
+    if loaded.get("start_dt") and loaded.get("end_dt"):
+        before = (
+            loaded.get("facility_id", instance.facility_id), loaded.get("court_id") if is_booking else None,
+            loaded["start_dt"], loaded["end_dt"],
+        )
+        if before != spans[0]:
+            spans.append(before)
+    return spans
+
+
+def sync(spans, facilities=None):
+    """Refresh the rows under (facility_id, court_id, start, end) spans from the source tables.
+
+    Called in the transaction of the write that moved them, so availability
+    never trails a booking or blackout. ``facilities`` maps ids to already
+    loaded facilities.
+    """
+    touched = defaultdict(lambda: (set(), []))
+    for facility_id, court_id, start, end in spans:
+        courts, windows = touched[facility_id]
+        courts.add(court_id)
+        windows.append((start, end))
+    loaded = dict(facilities or {})
+    missing = set(touched) - set(loaded)
+    if missing:
+        loaded.update(Facility.objects.in_bulk(missing))
+    for facility_id, (courts, windows) in touched.items():
+        facility = loaded.get(facility_id)
+        if facility is not None:
+            refresh(facility, courts, {day for s, e in windows for day in span_days(s, e, facility.tzinfo)})
+
+
+def reconcile(facility, first, last, apply=True):
+    """Compare stored rows in [first, last] against the source tables.
+
+    Returns the keys that differ; with ``apply`` they are rewritten.
+    """
+    source = _source_bits(facility, first, last)
+    existing = {
+        (o.court_id, o.date): o
+        for o in Occupancy.objects.filter(facility=facility, date__range=(first, last))
+    }
+    stale = sorted(
+        (key for key in set(source) | set(existing)
+         if key not in existing or key not in source
+         or existing[key].grid != grid_signature(facility, *key)
+         or (to_bits(existing[key].booked), to_bits(existing[key].blocked)) != source[key]),
+        key=lambda k: (k[1], k[0] or 0),
+    )
+    if apply and stale:
+        _write(facility, stale, source, existing)
+    return stale
+
+
+def day_occupancy_many(facilities, date):
+    """facility_id -> {court_id (None for the facility row): (booked, blocked)} on ``date``.
+
+    One query for all facilities; rows laid out on an old grid are rebuilt
+    and re-read.
+    """
+    facilities = {f.pk: f for f in facilities}
+    result = {pk: {} for pk in facilities}
+    stale = defaultdict(list)
+    rows = Occupancy.objects.filter(facility_id__in=list(facilities), date=date).values_list(
+        "facility_id", "court_id", "grid", "booked", "blocked")
+    for facility_id, court_id, grid, booked, blocked in rows:
+        if grid != grid_signature(facilities[facility_id], court_id, date):
+            stale[facility_id].append(court_id)
+        result[facility_id][court_id] = (to_bits(booked), to_bits(blocked))
+    for facility_id, court_ids in stale.items():
+        refresh(facilities[facility_id], court_ids, [date])
+    if stale:
+        result.update(day_occupancy_many([facilities[pk] for pk in stale], date))
+    return result
+
+
+def day_occupancy(facility, date):
+    """court_id (None for the facility row) -> (booked, blocked) bits on ``date``."""
+    return day_occupancy_many([facility], date)[facility.pk]
+
+
+def taken_bits(facility, date, occupancy, court_id):
+    """Bits of the slots of ``court_id`` on ``date`` that are booked or blacked out.
+
+    Blackouts are stored on the facility row, laid out on the facility's
+    grid; a court on a different grid that day reads them from the cached
+    blackout list instead.
+    """
+    booked = occupancy.get(court_id, EMPTY)[0]
+    own, shared = grid_for(facility, court_id, date.weekday()), grid_for(facility, None, date.weekday())
+    if own.signature == shared.signature:
+        return booked | occupancy.get(None, EMPTY)[1]
+    start, end = day_bounds(date, facility.tzinfo)
+    spans = [(b.start_dt, b.end_dt) for b in facility_blackouts(facility, start) if b.start_dt < end]
+    return booked | _spans_to_bits(generate_slots(facility, date, court_id), spans) if spans else booked
+
+
+def free_courts(facility, when):
+    """Active courts of ``facility`` with the slot starting at ``when`` free."""
+    date = timezone.localdate(when, facility.tzinfo)
+    occupancy = day_occupancy(facility, date)
+    free = []
+    for court in facility.courts.filter(is_active=True):
+        slots = generate_slots(facility, date, court.pk)
+        index = next((i for i, (s, _) in enumerate(slots) if s == when), None)
+        if index is not None and not taken_bits(facility, date, occupancy, court.pk) >> index & 1:
+            free.append(court)
+    return free
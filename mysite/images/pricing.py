@@ -0,0 +1,87 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .caching import PRICES, facility_version
+from .models import PriceRule
+from .schedules import grid_for
+
+PRICE_TABLE_SECONDS = 24 * 60 * 60
+CENTS = Decimal("0.01")
+
+
+def _specificity(rule):
+    return (2 if rule.court_id else 1 if rule.sport_id else 0, rule.priority, rule.pk)
+
+
+def _compile(facility):
+    rules = sorted(PriceRule.objects.filter(facility=facility), key=_specificity)
+    targets = [(None, None)] + list(facility.courts.values_list("id", "sport_id"))
+
+    table = {}
+    for court_id, sport_id in targets:
+        applicable = [
+            r for r in rules
+            if r.court_id in (None, court_id) and r.sport_id in (None, sport_id)
+            and (court_id or not (r.court_id or r.sport_id))
+        ]
+        days = []
+        for weekday in range(7):
+            step = grid_for(facility, court_id, weekday).step
+            base = (Decimal(facility.base_price) * step / 60).quantize(CENTS)
+            prices = {}
+            for start, _ in grid_for(facility, court_id, weekday).slots:
+                prices[start] = (base, step)
+                for rule in applicable:
+                    if rule.applies_to(weekday, start):
+                        prices[start] = ((Decimal(rule.price_per_hour) * step / 60).quantize(CENTS), step)
+            days.append(prices)
+        table[court_id] = tuple(days)
+    return {"prices": table}
+
+
+def price_table(facility):
+    """(price, slot length) of every slot of every court of ``facility``, by weekday and start minute.
+
+    Rules are painted over the base price from least to most specific
+    (facility, sport, court; then priority) and the result is cached under
+    the facility's ``PRICES`` tag, which only rule, court, schedule and
+    facility writes bump.
+    """
+    key = f"prices:{facility.pk}:{facility_version(facility.pk, PRICES)}"
+    table = cache.get(key)
+    if table is None:
+        table = _compile(facility)
+        cache.set(key, table, PRICE_TABLE_SECONDS)
+    return table
+
+
+def _slot_price(table, court_id, local_dt):
+    return table["prices"][court_id][local_dt.weekday()].get(local_dt.hour * 60 + local_dt.minute)
+
+
+def slot_prices(facility, court, slots):
+    table = price_table(facility)
+    court_id = court.pk if court else None
+    return [
+        (_slot_price(table, court_id, timezone.localtime(start, facility.tzinfo)) or (None,))[0]
+        for start, _ in slots
+    ]
+
+
+def quote(facility, court, start, end):
+    """Total price of a booking from ``start`` to ``end``, summed slot by slot."""
+    table = price_table(facility)
+    court_id = court.pk if court else None
+    total, t = Decimal(0), start
+    while t < end:
+        entry = _slot_price(table, court_id, timezone.localtime(t, facility.tzinfo))
+        if entry is None:
+            hours = Decimal(int((end - start).total_seconds() // 60)) / Decimal(60)
+            return (Decimal(facility.base_price) * hours).quantize(CENTS)
+        price, step = entry
+        total += price
+        t += timedelta(minutes=step)
+    return total
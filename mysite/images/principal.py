@@ -0,0 +1,100 @@
+from functools import partial, wraps
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.decorators import login_required
+from django.db.models import F
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.functional import SimpleLazyObject
+
+from .models import Facility
+
+
+class Principal:
+    """Who is making the request: the user, their role and the facilities they own."""
+
+    def __init__(self, user, role=None, facility_ids=()):
+        self.user = user
+        self.role = role
+        self.facility_ids = frozenset(facility_ids)
+
+    @property
+    def is_provider(self):
+        return self.role == "provider"
+
+    def owns(self, facility_id):
+        return int(facility_id) in self.facility_ids
+
+
+def load_user(user_id):
+    """The user with ``profile`` and their owned facility ids, from one joined query."""
+    rows = list(
+        get_user_model()._default_manager.select_related("profile")
+        .filter(pk=user_id)
+        .annotate(owned_facility_id=F("owned_facilities__id"))
+    )
+    if not rows:
+        return None
+    user = rows[0]
+    user._principal = Principal(
+        user,
+        getattr(getattr(user, "profile", None), "role", None),
+        [row.owned_facility_id for row in rows if row.owned_facility_id is not None],
+    )
+    return user
+
+
+class PrincipalBackend(ModelBackend):
+    """``ModelBackend`` whose per-request user lookup also loads the principal."""
+
+    def get_user(self, user_id):
+        user = load_user(user_id)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+def get_principal(request):
+    user = request.user
+    if not user.is_authenticated:
+        return Principal(user)
+    principal = getattr(user, "_principal", None)
+    if principal is None:
+        # Sessions started before PrincipalBackend, or the login request itself.
+        rows = get_user_model()._default_manager.filter(pk=user.pk).values_list(
+            "profile__role", "owned_facilities__id"
+        )
+        principal = Principal(user, rows[0][0] if rows else None, [fid for _, fid in rows if fid is not None])
+        user._principal = principal
+    return principal
+
+
+def principal_middleware(get_response):
+    """Expose the request's principal as ``request.principal``, loaded on first use."""
+
+    def middleware(request):
+        request.principal = SimpleLazyObject(partial(get_principal, request))
+        return get_response(request)
+
+    return middleware
+
+
+def provider_required(view):
+    """Require a signed-in provider; others are sent to the facility list."""
+
+    @wraps(view)
+    @login_required
+    def wrapper(request, *args, **kwargs):
+        if not request.principal.is_provider:
+            messages.error(request, "Only providers can access this page.")
+            return redirect("images:facilities_list")
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def check_owner(request, facility_id):
+    """The facility ``facility_id``; 404 unless the requesting user owns it."""
+    if not request.principal.owns(facility_id):
+        raise Http404("No Facility matches the given query.")
+    return get_object_or_404(Facility, pk=facility_id)
@@ -0,0 +1,184 @@
+import io
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+SUFFIXES = {"cprofile": ".pstats", "sample": ".folded"}
+
+
+def profile_dir():
+    return Path(settings.PROFILE_DIR)
+
+
+class _Sampler(threading.Thread):
+    """Record the stack of one thread every ``interval`` seconds as collapsed stacks."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+class _Capture:
+    def __init__(self, mode, interval):
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        if mode == "cprofile":
+            # Loaded on first capture: most requests never profile, and most processes never capture.
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # From Python 3.12 one profiler runs per interpreter; a debugger or a
+                # capture in a concurrent request may hold it, so sample this one instead.
+                mode = "sample"
+        if mode == "sample":
+            self.profiler = _Sampler(threading.get_ident(), interval)
+            self.profiler.start()
+        self.mode = mode
+
+    def finish(self, request, response):
+        duration = time.perf_counter() - self.started
+        if self.mode == "sample":
+            self.profiler.stop()
+        else:
+            self.profiler.disable()
+
+        path = profile_dir()
+        path.mkdir(parents=True, exist_ok=True)
+        profile_id = uuid.uuid4().hex
+        data = path / f"{profile_id}{SUFFIXES[self.mode]}"
+        if self.mode == "sample":
+            data.write_text("".join(f"{stack} {n}\n" for stack, n in self.profiler.stacks.most_common()))
+        else:
+            self.profiler.dump_stats(data)
+        match = request.resolver_match
+        (path / f"{profile_id}.json").write_text(json.dumps({
+            "id": profile_id,
+            "mode": self.mode,
+            "file": data.name,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 1),
+            "captured_at": self.started_at,
+        }))
+        _rotate(path, settings.PROFILE_KEEP)
+
+
+def _rotate(path, keep):
+    metas = sorted(path.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for meta in metas[keep:]:
+        for suffix in (".json", *SUFFIXES.values()):
+            meta.with_suffix(suffix).unlink(missing_ok=True)
+
+
+def captured_profiles():
+    """Metadata of every profile on disk, slowest first."""
+    profiles = []
+    for meta in profile_dir().glob("*.json"):
+        try:
+            profile = json.loads(meta.read_text())
+        except (OSError, ValueError):
+            continue
+        profile["captured_at"] = datetime.fromtimestamp(profile["captured_at"], dt_timezone.utc)
+        profiles.append(profile)
+    return sorted(profiles, key=lambda p: -p["duration_ms"])
+
+
+def load_profile(profile_id):
+    """(metadata, data file path) for ``profile_id``, or None."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    try:
+        meta = json.loads((profile_dir() / f"{profile_id}.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return meta, profile_dir() / meta["file"]
+
+
+def summary(meta, data, limit=40):
+    """Plain-text overview: top functions by cumulative time, or the hottest stacks."""
+    if meta["mode"] == "sample":
+        stacks = [line.rsplit(" ", 1) for line in data.read_text().splitlines()]
+        total = sum(int(n) for _, n in stacks)
+        return "\n".join(f"{int(n):6d}/{total}  {stack.replace(';', ' > ')}" for stack, n in stacks[:limit])
+    import pstats
+
+    out = io.StringIO()
+    pstats.Stats(str(data), stream=out).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+class ProfilingMiddleware:
+    """Profile a sample of requests and write them under ``PROFILE_DIR``.
+
+    A request is captured when it falls in the ``PROFILE_SAMPLE_RATE``
+    sample, routes to a view named in ``PROFILE_URL_NAMES``, or carries the
+    ``PROFILE_HEADER`` header and comes from a staff user. ``PROFILE_MODE``
+    picks cProfile (``.pstats``) or a stack sampler (collapsed ``.folded``
+    stacks, for flame graph tools). Everything else costs one random draw
+    and a header lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rate = settings.PROFILE_SAMPLE_RATE
+        self.url_names = set(settings.PROFILE_URL_NAMES)
+        self.header = settings.PROFILE_HEADER
+        self.mode = settings.PROFILE_MODE
+        self.interval = settings.PROFILE_SAMPLE_INTERVAL
+        if not (self.rate or self.url_names or self.header):
+            raise MiddlewareNotUsed
+        if self.mode not in SUFFIXES:
+            raise ValueError(f"PROFILE_MODE must be one of {', '.join(SUFFIXES)}.")
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        capture = getattr(request, "_profile_capture", None)
+        if capture is not None:
+            capture.finish(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self._wanted(request):
+            request._profile_capture = _Capture(self.mode, self.interval)
+
+    def _wanted(self, request):
+        if self.rate and random.random() < self.rate:
+            return True
+        match = request.resolver_match
+        if self.url_names and (match.view_name in self.url_names or match.url_name in self.url_names):
+            return True
+        return bool(self.header and self.header in request.headers and request.user.is_staff)
@@ -0,0 +1,106 @@
+from collections import defaultdict
+from typing import NamedTuple
+
+from django.core.cache import cache
+
+from .caching import SCHEDULE, facility_version
+from .models import Schedule, parse_hours
+
+SCHEDULE_CACHE_SECONDS = 24 * 60 * 60
+
+
+def minute_of_day(t):
+    return t.hour * 60 + t.minute
+
+
+class DayGrid(NamedTuple):
+    """One day's bookable slots as (start, end) minutes past local midnight."""
+
+    slots: tuple
+    step: int
+    signature: str
+    starts: dict
+    ends: dict
+    runs: tuple
+
+    def covers(self, start_m, end_m):
+        """Whether [start_m, end_m) is whole slots within one open interval."""
+        i, j = self.starts.get(start_m), self.ends.get(end_m)
+        return i is not None and j is not None and i <= j and self.runs[i] == self.runs[j]
+
+
+def day_grid(intervals, step):
+    slots, runs = [], []
+    for run, (opens, closes) in enumerate(intervals):
+        for m in range(opens, closes - step + 1, step):
+            slots.append((m, m + step))
+            runs.append(run)
+    return DayGrid(
+        slots=tuple(slots),
+        step=step,
+        signature=",".join(f"{o}-{c}" for o, c in intervals) + f"/{step}",
+        starts={s: i for i, (s, _) in enumerate(slots)},
+        ends={e: i for i, (_, e) in enumerate(slots)},
+        runs=tuple(runs),
+    )
+
+
+def _schedule_rows(facilities):
+    rows = defaultdict(list)
+    for facility_id, *row in Schedule.objects.filter(facility__in=facilities).values_list(
+            "facility_id", "court_id", "weekday", "hours", "slot_length_minutes"):
+        rows[facility_id].append(row)
+    return rows
+
+
+def _compile(facility, rows):
+    step = facility.slot_length_minutes
+    default = day_grid(((minute_of_day(facility.open_time), minute_of_day(facility.close_time)),), step)
+    days = {
+        (court_id, weekday): day_grid(parse_hours(hours), length or step)
+        for court_id, weekday, hours, length in rows
+    }
+    return {"default": default, "days": days}
+
+
+def _schedule_key(facility):
+    return f"schedule:{facility.pk}:{facility_version(facility.pk, SCHEDULE)}"
+
+
+def prefetch_schedules(facilities):
+    """Load the compiled schedules of saved ``facilities``, compiling the uncached ones from one query."""
+    keys = {_schedule_key(f): f for f in facilities if f.pk and getattr(f, "_compiled_schedule", None) is None}
+    found = cache.get_many(keys)
+    missing = [f for key, f in keys.items() if key not in found]
+    rows = _schedule_rows(missing) if missing else {}
+    compiled = {key: _compile(f, rows.get(f.pk, ())) for key, f in keys.items() if key not in found}
+    cache.set_many(compiled, SCHEDULE_CACHE_SECONDS)
+    for key, f in keys.items():
+        f._compiled_schedule = found.get(key) or compiled[key]
+
+
+def compiled_schedule(facility):
+    """Every day grid of ``facility``, keyed by (court id or None, weekday).
+
+    Cached under the facility's ``SCHEDULE`` tag, which only schedule and
+    facility writes bump, and kept on the instance for the rest of the request.
+    """
+    compiled = getattr(facility, "_compiled_schedule", None)
+    if compiled is None:
+        if facility.pk is None:
+            compiled = _compile(facility, ())
+        else:
+            key = _schedule_key(facility)
+            compiled = cache.get(key)
+            if compiled is None:
+                compiled = _compile(facility, _schedule_rows([facility]).get(facility.pk, ()))
+                cache.set(key, compiled, SCHEDULE_CACHE_SECONDS)
+        facility._compiled_schedule = compiled
+    return compiled
+
+
+def grid_for(facility, court_id, weekday):
+    """The day grid for a court (or the facility, for None) on ``weekday``."""
+    compiled = compiled_schedule(facility)
+    days = compiled["days"]
+    return days.get((court_id, weekday)) or days.get((None, weekday)) or compiled["default"]
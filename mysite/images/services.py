@@ -1,69 +1,149 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from django.core.cache import cache
+from django.db.models import Q
 from django.utils import timezone
-from .models import Booking, Blackout
+from .caching import BLACKOUTS, facility_version
+from .models import Blackout, Court, Facility
+from .schedules import grid_for, prefetch_schedules
 
+NOTICE_LIMIT = 20
+NOTICE_HISTORY = timedelta(days=180)
+NOTICE_CACHE_SECONDS = 60 * 60
 
-def generate_slots(facility, date):
-    start = timezone.make_aware(datetime.combine(date, facility.open_time))
-    end = timezone.make_aware(datetime.combine(date, facility.close_time))
-    step = timedelta(minutes=facility.slot_length_minutes)
-    res, t = [], start
-    while t + step <= end:
-        res.append((t, t + step))
-        t += step
-    return res
 
+def _local_time(m):
+    return time(m // 60, m % 60)
 
-def _filter_free(slots, booked, blocked):
+
+@lru_cache(maxsize=1024)
+def _slot_template(slots, tz_name, offset):
+    """Slot bounds as offsets from UTC midnight for a day at ``offset`` from UTC."""
+    return tuple((timedelta(minutes=s) - offset, timedelta(minutes=e) - offset) for s, e in slots)
+
+
+def generate_slots(facility, date, court_id=None):
+    """The slots of a court (or the facility, for None) on ``date`` as aware (start, end) pairs in UTC.
+
+    The day's grid comes from the compiled schedule, and days share a cached
+    template per (grid, zone, UTC offset), so a day costs one shift; days
+    whose offset changes during opening hours are laid out slot by slot.
+    """
+    tz = facility.tzinfo
+    slots = grid_for(facility, court_id, date.weekday()).slots
+    if not slots:
+        return []
+    offset = datetime.combine(date, _local_time(slots[0][0]), tzinfo=tz).utcoffset()
+    if datetime.combine(date, _local_time(slots[-1][1]), tzinfo=tz).utcoffset() != offset:
+        def at(m):
+            return datetime.combine(date, _local_time(m), tzinfo=tz).astimezone(dt_timezone.utc)
+
+        # Slots swallowed by a spring-forward gap come out empty and are dropped.
+        return [(at(s), at(e)) for s, e in slots if at(s) < at(e)]
+    template = _slot_template(slots, facility.timezone, offset)
+    base = datetime.combine(date, time.min, tzinfo=dt_timezone.utc)
+    return [(base + s, base + e) for s, e in template]
+
+
+def facility_blackouts(facility, since):
+    """Blackouts of ``facility`` ending at or after ``since``, ordered by start.
+
+    The recent window (``NOTICE_HISTORY`` back from now) is loaded with one
+    query on (facility, end_dt) and memoized under the facility's
+    ``BLACKOUTS`` tag, which only blackout writes bump; older windows fall
+    through to the database.
+    """
+    key = f"blackouts:{facility.pk}:{facility_version(facility.pk, BLACKOUTS)}"
+    entry = cache.get(key)
+    if entry is None:
+        window_start = timezone.now() - NOTICE_HISTORY
+        rows = list(
+            Blackout.objects.filter(facility=facility, end_dt__gte=window_start).order_by("start_dt")
+        )
+        entry = (window_start, rows)
+        cache.set(key, entry, NOTICE_CACHE_SECONDS)
+    window_start, rows = entry
+    if since < window_start:
+        return list(Blackout.objects.filter(facility=facility, end_dt__gte=since).order_by("start_dt"))
+    return [b for b in rows if b.end_dt >= since]
+
+
+def day_bounds(date, tz=None):
+    """Aware start and end of ``date`` in ``tz`` (the current time zone by default)."""
+    tz = tz or timezone.get_current_timezone()
+    start = datetime.combine(date, time.min, tzinfo=tz)
+    return start, datetime.combine(date + timedelta(days=1), time.min, tzinfo=tz)
+
+
+def notice_timeline(facility, date):
     now = timezone.now()
+    day_start, day_end = day_bounds(date, facility.tzinfo)
+    rows = facility_blackouts(facility, min(now - NOTICE_HISTORY, day_start))
+    past = [b for b in rows if b.end_dt < now]
+    past.reverse()
+    return {
+        "upcoming_blackouts": [b for b in rows if b.end_dt >= now][:NOTICE_LIMIT],
+        "past_blackouts": past[:NOTICE_LIMIT],
+        "day_blackouts": [b for b in rows if b.start_dt < day_end and b.end_dt >= day_start],
+    }
 
-    def free(s, e):
-        if (s - now) < timedelta(hours=1):
-            return False
-        for bs, be in booked:
-            if s < be and e > bs:
-                return False
-        for os, oe in blocked:
-            if s < oe and e > os:
-                return False
-        return True
 
-    return [(s, e) for s, e in slots if free(s, e)]
+def free_slots(slots, taken):
+    now = timezone.now()
+    return [
+        (s, e)
+        for i, (s, e) in enumerate(slots)
+        if not taken >> i & 1 and (s - now) >= timedelta(hours=1)
+    ]
 
 
 def available_slots(facility, date):
-    slots = generate_slots(facility, date)
-    booked = list(
-        Booking.objects.filter(
-            facility=facility,
-            court__isnull=True,
-            status="confirmed",
-            start_dt__date=date,
-        ).values_list("start_dt", "end_dt")
-    )
-    blocked = list(
-        Blackout.objects.filter(
-            facility=facility,
-            start_dt__date__lte=date,
-            end_dt__date__gte=date,
-        ).values_list("start_dt", "end_dt")
-    )
-    return _filter_free(slots, booked, blocked)
+    from .occupancy import day_occupancy, taken_bits
+
+    return free_slots(generate_slots(facility, date), taken_bits(facility, date, day_occupancy(facility, date), None))
 
 
 def available_slots_court(court, date):
+    from .occupancy import day_occupancy, taken_bits
+
     facility = court.facility
-    slots = generate_slots(facility, date)
-    booked = list(
-        Booking.objects.filter(
-            court=court, status="confirmed", start_dt__date=date
-        ).values_list("start_dt", "end_dt")
-    )
-    blocked = list(
-        Blackout.objects.filter(
-            facility=facility,
-            start_dt__date__lte=date,
-            end_dt__date__gte=date,
-        ).values_list("start_dt", "end_dt")
+    return free_slots(
+        generate_slots(facility, date, court.pk), taken_bits(facility, date, day_occupancy(facility, date), court.pk)
     )
-    return _filter_free(slots, booked, blocked)
+
+
+def search_free_slots(sport, date, start_time=None, end_time=None, location=""):
+    """Free slots on ``date`` across every facility offering ``sport``, earliest first.
+
+    Matches courts by ``Court.sport`` or ``Facility.sport_text`` (and
+    court-less facilities by ``sport_text``), then reads the occupancy of all
+    of them in one query; schedules load in one batch too. Returns
+    (start, end, facility, court) tuples.
+    """
+    from .occupancy import day_occupancy_many, taken_bits
+
+    sport_q = Q(sport__name__iexact=sport) | Q(facility__sport_text__iexact=sport)
+    courts = Court.objects.filter(sport_q, is_active=True).select_related("facility")
+    loose = Facility.objects.filter(sport_text__iexact=sport).exclude(courts__is_active=True)
+    if location:
+        courts = courts.filter(facility__location__icontains=location)
+        loose = loose.filter(location__icontains=location)
+    # One instance per facility, so the schedules prefetched onto it serve all of its courts.
+    facilities = {}
+    targets = [(facilities.setdefault(c.facility_id, c.facility), c) for c in courts]
+    targets += [(facilities.setdefault(f.pk, f), None) for f in loose]
+    prefetch_schedules(facilities.values())
+    occupancy = day_occupancy_many(facilities.values(), date)
+
+    results = []
+    for facility, court in targets:
+        court_id = court.pk if court else None
+        slots = generate_slots(facility, date, court_id)
+        taken = taken_bits(facility, date, occupancy[facility.pk], court_id)
+        for s, e in free_slots(slots, taken):
+            tz = facility.tzinfo
+            local_s, local_e = timezone.localtime(s, tz).time(), timezone.localtime(e, tz).time()
+            if (start_time is None or local_s >= start_time) and (end_time is None or local_e <= end_time):
+                results.append((s, e, facility, court))
+    results.sort(key=lambda r: (r[0], r[2].name, r[3].name if r[3] else ""))
+    return results
@@ -0,0 +1,302 @@
+"""A Django cache backend shared by every process on a host through one memory-mapped file.
+
+The file holds a fixed number of fixed-size slots grouped into sets of
+``WAYS``; a key can only live in the set its hash picks. Readers take no
+locks: each slot carries a sequence number that writers make odd while
+they change the slot, and a read that sees it odd or changed retries (a
+seqlock). Writers lock their set with an ``fcntl`` byte-range lock. Full
+sets evict with CLOCK: a hit sets the slot's reference bit and the
+set's hand skips (and clears) referenced slots.
+
+Every process must use the same ``MAX_ENTRIES`` and ``SLOT_SIZE``. A file
+written with other sizes is replaced by a fresh one renamed over it, never
+truncated in place, since other processes may still have it mapped; they
+notice the new file within ``RECHECK_SECONDS`` and map it instead. Values
+that don't fit a slot even after compression are not stored.
+"""
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+MAGIC = b"SRSHMC01"
+WAYS = 8
+# seq, key hash, expires (0: never), value length, key length, flags
+SLOT = struct.Struct("<QQdIHBx")
+SEQ = struct.Struct("<Q")
+HEADER = struct.Struct("<8sIII")
+HEADER_SIZE = 64
+COMPRESSED = 1
+COMPRESS_MIN = 1024
+READ_RETRIES = 16
+RECHECK_SECONDS = 1.0
+
+_mappings = {}
+_mappings_lock = threading.Lock()
+
+
+class _Mapping:
+    def __init__(self, path, slot_size, n_slots):
+        self.slot_size = slot_size
+        self.n_slots = n_slots
+        self.n_sets = n_slots // WAYS
+        self.refs = HEADER_SIZE
+        self.hands = self.refs + n_slots
+        self.slots = -(-(self.hands + self.n_sets) // 64) * 64
+        self.size = self.slots + n_slots * slot_size
+        self.path = path
+        header = HEADER.pack(MAGIC, slot_size, n_slots, WAYS)
+
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.pread(fd, HEADER.size, 0) == header and os.fstat(fd).st_size == self.size:
+                break
+            # Processes starting together all find the same unusable file; only the first
+            # to lock it replaces it, and the rest reopen whatever that one put in its place.
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            try:
+                if _same_file(fd, path):
+                    self._replace(header)
+            finally:
+                os.close(fd)
+        self.fd = fd
+        # A replaced mapping may still be in use by another thread, so it is never closed explicitly.
+        weakref.finalize(self, os.close, fd)
+        self.inode = os.fstat(fd).st_ino
+        self.checked = time.monotonic()
+        self.mm = mmap.mmap(self.fd, self.size)
+        # fcntl locks are per process; threads also need to exclude each other.
+        self.thread_lock = threading.Lock()
+
+    def _replace(self, header):
+        directory, name = os.path.split(self.path)
+        fd, tmp = tempfile.mkstemp(prefix=f".{name}.", dir=directory or ".")
+        try:
+            os.ftruncate(fd, self.size)
+            os.pwrite(fd, header, 0)
+            os.fchmod(fd, 0o600)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        finally:
+            os.close(fd)
+
+    def current(self):
+        """False once the file at ``path`` has been replaced by another process."""
+        now = time.monotonic()
+        if now - self.checked < RECHECK_SECONDS:
+            return True
+        self.checked = now
+        try:
+            return os.stat(self.path).st_ino == self.inode
+        except FileNotFoundError:
+            return False
+
+    def offset(self, i):
+        return self.slots + i * self.slot_size
+
+    @contextmanager
+    def locked(self, set_index=None):
+        # The lock ranges are arbitrary bytes standing for sets, not file data.
+        start, length = (0, 0) if set_index is None else (set_index, 1)
+        with self.thread_lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, length, start)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, length, start)
+
+
+def _same_file(fd, path):
+    try:
+        return os.stat(path).st_ino == os.fstat(fd).st_ino
+    except FileNotFoundError:
+        return False
+
+
+def _mapping(path, slot_size, n_slots):
+    # Keyed by pid so a forked worker opens its own descriptor and thread lock.
+    key = (path, slot_size, n_slots, os.getpid())
+    mapping = _mappings.get(key)
+    if mapping is not None and mapping.current():
+        return mapping
+    with _mappings_lock:
+        # Another thread may have remapped while this one waited.
+        if _mappings.get(key) is mapping:
+            _mappings[key] = _Mapping(path, slot_size, n_slots)
+        return _mappings[key]
+
+
+class SharedMemoryCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._path = location
+        self._slot_size = int(options.get("SLOT_SIZE", 16384))
+        self._n_slots = max(1, -(-self._max_entries // WAYS)) * WAYS
+
+    @property
+    def _m(self):
+        return _mapping(self._path, self._slot_size, self._n_slots)
+
+    def _key(self, key, version):
+        key = self.make_and_validate_key(key, version=version).encode()
+        h = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+        return key, h or 1
+
+    def _expires(self, timeout):
+        expires = self.get_backend_timeout(timeout)
+        return 0.0 if expires is None else expires
+
+    @staticmethod
+    def _encode(value):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) >= COMPRESS_MIN:
+            packed = zlib.compress(data, 1)
+            if len(packed) < len(data):
+                return packed, COMPRESSED
+        return data, 0
+
+    @staticmethod
+    def _decode(data, flags):
+        return pickle.loads(zlib.decompress(data) if flags & COMPRESSED else data)
+
+    def _read(self, m, key, h):
+        """(value bytes, flags) for a live ``key``, without locking; None on a miss."""
+        now = time.time()
+        mm, limit = m.mm, m.slot_size - SLOT.size
+        first = (h % m.n_sets) * WAYS
+        for i in range(first, first + WAYS):
+            off = m.offset(i)
+            for _ in range(READ_RETRIES):
+                seq, slot_hash, expires, vlen, klen, flags = SLOT.unpack_from(mm, off)
+                if seq & 1 or klen + vlen > limit:
+                    continue
+                if slot_hash != h:
+                    break
+                data = mm[off + SLOT.size:off + SLOT.size + klen + vlen]
+                if SEQ.unpack_from(mm, off)[0] != seq:
+                    continue
+                if data[:klen] != key or (expires and expires <= now):
+                    break
+                mm[m.refs + i] = 1
+                return data[klen:], flags
+        return None
+
+    def _find(self, m, key, h, now):
+        """Under the set lock: (slot of live ``key`` or None, slot to write ``key`` into)."""
+        mm = m.mm
+        first = (h % m.n_sets) * WAYS
+        free = None
+        for i in range(first, first + WAYS):
+            off = m.offset(i)
+            _, slot_hash, expires, _, klen, _ = SLOT.unpack_from(mm, off)
+            alive = slot_hash and not (expires and expires <= now)
+            if alive and slot_hash == h and mm[off + SLOT.size:off + SLOT.size + klen] == key:
+                return i, i
+            if not alive and free is None:
+                free = i
+        if free is None:
+            set_index = first // WAYS
+            hand = mm[m.hands + set_index]
+            while mm[m.refs + first + hand]:
+                mm[m.refs + first + hand] = 0
+                hand = (hand + 1) % WAYS
+            free = first + hand
+            mm[m.hands + set_index] = (hand + 1) % WAYS
+        return None, free
+
+    def _write(self, m, i, h=0, expires=0.0, key=b"", data=b"", flags=0):
+        mm, off = m.mm, m.offset(i)
+        seq = SEQ.unpack_from(mm, off)[0] | 1
+        SEQ.pack_into(mm, off, seq)
+        mm[off + SLOT.size:off + SLOT.size + len(key) + len(data)] = key + data
+        SLOT.pack_into(mm, off, seq, h, expires, len(data), len(key), flags)
+        SEQ.pack_into(mm, off, seq + 1)
+        mm[m.refs + i] = 1 if h else 0
+
+    def _store(self, key, h, value, timeout, only_new=False):
+        m = self._m
+        data, flags = self._encode(value)
+        fits = SLOT.size + len(key) + len(data) <= m.slot_size
+        with m.locked(h % m.n_sets):
+            found, slot = self._find(m, key, h, time.time())
+            if only_new and found is not None:
+                return False
+            if not fits:
+                if found is not None:
+                    self._write(m, found)
+                return False
+            self._write(m, slot, h, self._expires(timeout), key, data, flags)
+            return True
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key, h = self._key(key, version)
+        return self._store(key, h, value, timeout, only_new=True)
+
+    def get(self, key, default=None, version=None):
+        key, h = self._key(key, version)
+        found = self._read(self._m, key, h)
+        return default if found is None else self._decode(*found)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key, h = self._key(key, version)
+        self._store(key, h, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key, h = self._key(key, version)
+        m = self._m
+        with m.locked(h % m.n_sets):
+            found, _ = self._find(m, key, h, time.time())
+            if found is None:
+                return False
+            off = m.offset(found)
+            _, _, _, vlen, klen, flags = SLOT.unpack_from(m.mm, off)
+            data = m.mm[off + SLOT.size + klen:off + SLOT.size + klen + vlen]
+            self._write(m, found, h, self._expires(timeout), key, data, flags)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key, h = self._key(key, version)
+        m = self._m
+        with m.locked(h % m.n_sets):
+            found, _ = self._find(m, key, h, time.time())
+            if found is None:
+                raise ValueError(f"Key '{key.decode()}' not found")
+            off = m.offset(found)
+            _, _, expires, vlen, klen, flags = SLOT.unpack_from(m.mm, off)
+            value = self._decode(m.mm[off + SLOT.size + klen:off + SLOT.size + klen + vlen], flags) + delta
+            self._write(m, found, h, expires, key, *self._encode(value))
+            return value
+
+    def delete(self, key, version=None):
+        key, h = self._key(key, version)
+        m = self._m
+        with m.locked(h % m.n_sets):
+            found, _ = self._find(m, key, h, time.time())
+            if found is None:
+                return False
+            self._write(m, found)
+            return True
+
+    def has_key(self, key, version=None):
+        key, h = self._key(key, version)
+        return self._read(self._m, key, h) is not None
+
+    def clear(self):
+        m = self._m
+        with m.locked():
+            for i in range(m.n_slots):
+                if SLOT.unpack_from(m.mm, m.offset(i))[1]:
+                    self._write(m, i)
@@ -0,0 +1,94 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import admission, occupancy
+from .caching import BLACKOUTS, PRICES, SCHEDULE, touch_compiled, touch_facility
+from .models import Blackout, Booking, Court, Facility, PriceRule, Schedule, Sport
+
+
+@receiver([post_save, post_delete], sender=Booking)
+@receiver([post_save, post_delete], sender=Blackout)
+@receiver([post_save, post_delete], sender=PriceRule)
+@receiver([post_save, post_delete], sender=Schedule)
+def purge_facility_pages(sender, instance, **kwargs):
+    touch_facility(instance.facility_id)
+
+
+@receiver([post_save, post_delete], sender=PriceRule)
+@receiver([post_save, post_delete], sender=Court)
+def purge_price_table(sender, instance, **kwargs):
+    touch_compiled(instance.facility_id, PRICES)
+
+
+@receiver([post_save, post_delete], sender=Schedule)
+def purge_schedule(sender, instance, **kwargs):
+    # Prices are laid out on the schedule's slot grids.
+    touch_compiled(instance.facility_id, PRICES, SCHEDULE)
+
+
+@receiver([post_save, post_delete], sender=Blackout)
+def purge_blackout_list(sender, instance, **kwargs):
+    touch_compiled(instance.facility_id, BLACKOUTS)
+
+
+@receiver(post_save, sender=Facility)
+def purge_compiled_facility(sender, instance, **kwargs):
+    touch_compiled(instance.pk, PRICES, SCHEDULE)
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Blackout)
+@receiver(post_delete, sender=Court)
+def journal_deletion(sender, instance, using, **kwargs):
+    # Saves journal themselves (JournaledModel.save); deletes run inside the collector's transaction.
+    instance.journal_event("deleted").save(using=using)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_save, sender=Blackout)
+def sync_occupancy(sender, instance, raw=False, **kwargs):
+    if not raw:
+        occupancy.sync(occupancy.written_spans(instance), {instance.facility_id: instance.facility})
+
+
+@receiver(post_delete, sender=Booking)
+@receiver(post_delete, sender=Blackout)
+def clear_occupancy(sender, instance, origin=None, **kwargs):
+    # Deleting a facility or court takes its occupancy rows with it; cancelled
+    # bookings never set bits, and past days are dropped by archive_bookings.
+    if isinstance(origin, (Facility, Court)):
+        return
+    if sender is Booking and (instance.status != "confirmed" or instance.end_dt <= timezone.now()):
+        return
+    occupancy.sync(occupancy.written_spans(instance))
+
+
+@receiver(post_save, sender=Booking)
+def forget_taken_slot(sender, instance, **kwargs):
+    # Other workers' copies simply expire.
+    if instance.status != "confirmed":
+        admission.taken.discard(instance.facility_id, str(instance.court_id or ""), instance.start_dt, instance.end_dt)
+
+
+@receiver([post_save, post_delete], sender=Court)
+def purge_court_pages(sender, instance, **kwargs):
+    touch_facility(instance.facility_id, listing=True)
+
+
+@receiver([post_save, post_delete], sender=Facility)
+def purge_facility_listing(sender, instance, **kwargs):
+    touch_facility(instance.pk, listing=True)
+
+
+@receiver(post_save, sender=Facility)
+def build_image_derivatives(sender, instance, raw=False, **kwargs):
+    from . import derivatives  # Pillow is loaded on first use, not at startup.
+
+    if not raw and derivatives.needs_build(instance):
+        derivatives.schedule(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Sport)
+def purge_sport_listing(sender, instance, **kwargs):
+    touch_facility(listing=True)
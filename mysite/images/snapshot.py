@@ -0,0 +1,232 @@
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .history import booking_history
+from .models import Booking, Court, Facility
+
+COLUMNS = {
+    "id": "<i8",
+    "user": "<i8",
+    "facility": "<i4",
+    "court": "<i4",
+    "start": "<M8[s]",
+    "end": "<M8[s]",
+    "price": "<i8",
+    "status": "i1",
+    "created": "<M8[us]",
+}
+STATUSES = [value for value, _ in Booking.STATUS]
+NO_COURT = -1
+# Ids per refresh query; the history union binds each twice, which keeps it under SQLite's variable limit.
+REFRESH_BATCH = 5_000
+
+
+def snapshot_dir(path=None):
+    return Path(path or settings.BOOKING_SNAPSHOT_DIR)
+
+
+def _column_path(path, meta, name):
+    return path / f"{name}.{meta['generation']}.bin"
+
+
+def _read_meta(path):
+    try:
+        with open(path / "meta.json") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def _write_meta(path, meta):
+    tmp = path / "meta.json.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(meta, fh, indent=1)
+    os.replace(tmp, path / "meta.json")
+
+
+def _refresh_dictionaries(meta):
+    """Sync the facility and court dictionaries; existing codes never move."""
+    codes = {f["id"]: i for i, f in enumerate(meta["facilities"])}
+    for row in Facility.objects.order_by("pk").values("id", "name", "timezone", "owner_id"):
+        if row["id"] in codes:
+            meta["facilities"][codes[row["id"]]] = row
+        else:
+            codes[row["id"]] = len(meta["facilities"])
+            meta["facilities"].append(row)
+    court_codes = {c["id"]: i for i, c in enumerate(meta["courts"])}
+    for row in Court.objects.order_by("pk").values("id", "name", "facility_id"):
+        row = {"id": row["id"], "name": row["name"], "facility": codes[row["facility_id"]]}
+        if row["id"] in court_codes:
+            meta["courts"][court_codes[row["id"]]] = row
+        else:
+            court_codes[row["id"]] = len(meta["courts"])
+            meta["courts"].append(row)
+    return codes, court_codes
+
+
+def _epoch(values, unit):
+    scale = 1_000_000 if unit == "us" else 1
+    return np.fromiter(
+        (int(v.timestamp() * scale) for v in values), dtype=np.int64, count=len(values)
+    ).astype(f"<M8[{unit}]")
+
+
+def _encode(rows, facility_codes, court_codes):
+    return {
+        "id": np.fromiter((r["id"] for r in rows), dtype="<i8", count=len(rows)),
+        "user": np.fromiter((r["user_id"] for r in rows), dtype="<i8", count=len(rows)),
+        "facility": np.fromiter((facility_codes[r["facility_id"]] for r in rows), dtype="<i4", count=len(rows)),
+        "court": np.fromiter(
+            (court_codes[r["court_id"]] if r["court_id"] else NO_COURT for r in rows), dtype="<i4", count=len(rows)
+        ),
+        "start": _epoch([r["start_dt"] for r in rows], "s"),
+        "end": _epoch([r["end_dt"] for r in rows], "s"),
+        "price": np.fromiter((round(r["price"] * 100) for r in rows), dtype="<i8", count=len(rows)),
+        "status": np.fromiter((STATUSES.index(r["status"]) for r in rows), dtype="i1", count=len(rows)),
+        "created": _epoch([r["created_at"] for r in rows], "us"),
+    }
+
+
+def write_snapshot(path=None, full=False, chunk=50_000, log=None):
+    """Append bookings newer than the snapshot's last id, or rebuild it with ``full``.
+
+    Columns are raw little-endian files described by ``meta.json``; the
+    row count in the metadata is only advanced once the data is on disk,
+    so readers never see a partial append. Live and archived bookings are
+    both exported.
+
+    ``settled_before`` is the time the latest export began. Readers take
+    bookings starting after it from the database, so an append first
+    rewrites the exported rows that start after the previous one with their
+    current state (rows deleted outright become cancelled) and then moves it
+    forward. Customers can't cancel or move a booking within
+    ``booking_updates.CHANGE_NOTICE`` of its start, so rows starting before
+    it are final; staff changes to bookings that had already started (admin
+    actions, blackouts laid over the past) only reach the snapshot with a
+    ``full`` rebuild. Returns (rows appended, total rows).
+    """
+    started = datetime.now(dt_timezone.utc)
+    path = snapshot_dir(path)
+    path.mkdir(parents=True, exist_ok=True)
+    old = _read_meta(path)
+    # Snapshots written before settled_before existed are rebuilt once.
+    meta = None if full or old is None or "settled_before" not in old else old
+    if meta is None:
+        meta = {
+            "generation": f"{time.time_ns():x}",
+            "settled_before": started.isoformat(),
+            "columns": COLUMNS,
+            "statuses": STATUSES,
+            "rows": 0,
+            "last_id": 0,
+            "last_created_at": None,
+            "facilities": [],
+            "courts": [],
+        }
+    facility_codes, court_codes = _refresh_dictionaries(meta)
+
+    files = {}
+    for name, dtype in COLUMNS.items():
+        fh = open(_column_path(path, meta, name), "ab")
+        # Drop any tail left behind by an append that never reached meta.json.
+        fh.truncate(meta["rows"] * np.dtype(dtype).itemsize)
+        files[name] = fh
+    appended = 0
+    try:
+        if meta is old:
+            refreshed = _refresh_unsettled(path, meta, facility_codes, court_codes)
+            if log:
+                log(f"Refreshed {refreshed} bookings starting after the last export.")
+        rows = booking_history(id__gt=meta["last_id"]).order_by("id")
+        batch = []
+        for row in rows.iterator(chunk_size=chunk):
+            batch.append(row)
+            if len(batch) == chunk:
+                appended += _append(files, meta, batch, facility_codes, court_codes)
+                batch = []
+                if log:
+                    log(f"Exported {appended} bookings...")
+        if batch:
+            appended += _append(files, meta, batch, facility_codes, court_codes)
+        for fh in files.values():
+            fh.flush()
+            os.fsync(fh.fileno())
+    finally:
+        for fh in files.values():
+            fh.close()
+
+    meta["rows"] += appended
+    meta["settled_before"] = started.isoformat()
+    meta["snapshot_at"] = datetime.now(dt_timezone.utc).isoformat()
+    _write_meta(path, meta)
+    if old is not None and old["generation"] != meta["generation"]:
+        for name in COLUMNS:
+            _column_path(path, old, name).unlink(missing_ok=True)
+    return appended, meta["rows"]
+
+
+def _refresh_unsettled(path, meta, facility_codes, court_codes):
+    """Rewrite the exported rows starting at or after ``settled_before`` in place; returns how many.
+
+    Readers holding the current metadata take these rows from the database,
+    so they never look at the values being rewritten.
+    """
+    if not meta["rows"]:
+        return 0
+    columns = {
+        name: np.memmap(_column_path(path, meta, name), dtype=dtype, mode="r+", shape=(meta["rows"],))
+        for name, dtype in COLUMNS.items()
+    }
+    settled = math.floor(datetime.fromisoformat(meta["settled_before"]).timestamp())
+    positions = np.flatnonzero(columns["start"] >= np.datetime64(settled, "s"))
+    cancelled = STATUSES.index("cancelled")
+    for i in range(0, len(positions), REFRESH_BATCH):
+        at = positions[i:i + REFRESH_BATCH]
+        # Ids ascend through the file, so ``ids`` is sorted.
+        ids = columns["id"][at]
+        rows = sorted(booking_history(id__in=ids.tolist()), key=lambda r: r["id"])
+        found = np.fromiter((r["id"] for r in rows), dtype="<i8", count=len(rows))
+        columns["status"][at[~np.isin(ids, found)]] = cancelled
+        if rows:
+            where = at[np.searchsorted(ids, found)]
+            for name, values in _encode(rows, facility_codes, court_codes).items():
+                columns[name][where] = values
+    for column in columns.values():
+        column.flush()
+    return len(positions)
+
+
+def _append(files, meta, batch, facility_codes, court_codes):
+    for name, values in _encode(batch, facility_codes, court_codes).items():
+        files[name].write(values.tobytes())
+    meta["last_id"] = batch[-1]["id"]
+    meta["last_created_at"] = max(
+        filter(None, [meta["last_created_at"], batch[-1]["created_at"].isoformat()])
+    )
+    return len(batch)
+
+
+def load_snapshot(path=None):
+    """Memory-map the snapshot at ``path`` read-only, or None if there is none yet.
+
+    Returns the metadata with a ``data`` dict of column arrays. ``facility``
+    and ``court`` hold codes into ``facilities``/``courts`` (``NO_COURT`` for
+    none), ``status`` codes into ``statuses`` and ``price`` is in cents.
+    """
+    path = snapshot_dir(path)
+    meta = _read_meta(path)
+    if meta is None:
+        return None
+    meta["data"] = {
+        name: np.memmap(_column_path(path, meta, name), dtype=dtype, mode="r", shape=(meta["rows"],))
+        if meta["rows"] else np.empty(0, dtype=dtype)
+        for name, dtype in meta["columns"].items()
+    }
+    return meta
@@ -0,0 +1,108 @@
+from contextlib import ExitStack
+from datetime import datetime, time, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from images import admission
+from images.models import Blackout, Booking, Court, Facility
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GateTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(admission, "BOOKING_QUEUE_SECONDS", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_admits_up_to_the_limit_per_facility(self):
+        with ExitStack() as stack:
+            for _ in range(admission.BOOKING_CONCURRENCY):
+                stack.enter_context(admission.gate(1))
+            with self.assertRaises(admission.Busy):
+                stack.enter_context(admission.gate(1))
+            # Other facilities have their own places.
+            stack.enter_context(admission.gate(2))
+        # Leaving frees the places.
+        with admission.gate(1):
+            pass
+
+    def test_a_lapsed_lease_is_left_to_its_new_holder(self):
+        with admission.gate(1):
+            key = admission._place_key(1, 0)
+            cache.set(key, "someone else")
+        self.assertEqual(cache.get(key), "someone else")
+
+
+class TakenSlotsTests(SimpleTestCase):
+    def test_entries_expire_and_are_bounded(self):
+        taken = admission._TakenSlots()
+        taken.add(1, None, "a", "b")
+        self.assertIn((1, None, "a", "b"), taken)
+        self.assertNotIn((1, 2, "a", "b"), taken)
+        later = admission.time.monotonic() + admission.TAKEN_SECONDS + 1
+        with mock.patch.object(admission.time, "monotonic", return_value=later):
+            self.assertNotIn((1, None, "a", "b"), taken)
+        with mock.patch.object(admission, "TAKEN_MAX_ENTRIES", 2):
+            for i in range(3):
+                taken.add(1, None, i, i)
+        self.assertEqual([(1, None, i, i) in taken for i in range(3)], [False, True, True])
+        taken.discard(1, None, 2, 2)
+        self.assertNotIn((1, None, 2, 2), taken)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BookViewAdmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(admission, "taken", admission._TakenSlots())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create(username="u")
+        self.other = User.objects.create(username="v")
+        owner = User.objects.create(username="p")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.court = Court.objects.create(facility=self.facility, name="C1")
+        day = timezone.localdate(timezone=self.facility.tzinfo) + timedelta(days=2)
+        self.start = timezone.make_aware(datetime.combine(day, time(10)), self.facility.tzinfo)
+        self.end = self.start + timedelta(hours=1)
+        self.url = reverse("images:book", args=[self.facility.pk])
+
+    def post(self, user):
+        self.client.force_login(user)
+        return self.client.post(
+            self.url, {"court": self.court.pk, "start": self.start.isoformat(), "end": self.end.isoformat()},
+        )
+
+    def slot(self):
+        return self.facility.pk, str(self.court.pk), self.start, self.end
+
+    def test_taken_slot_is_turned_away_without_validating(self):
+        self.post(self.user)
+        self.assertIn(self.slot(), admission.taken)
+        with mock.patch("images.views.bookings.validate_booking") as validate:
+            self.post(self.other)
+        validate.assert_not_called()
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_only_clashes_feed_the_shortcut(self):
+        Blackout.objects.create(facility=self.facility, start_dt=self.start, end_dt=self.end)
+        self.post(self.user)
+        self.assertNotIn(self.slot(), admission.taken)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_full_gate_answers_429_with_a_retry_hint(self):
+        for i in range(admission.BOOKING_CONCURRENCY):
+            cache.add(admission._place_key(self.facility.pk, i), "busy")
+        with mock.patch.object(admission, "BOOKING_QUEUE_SECONDS", 0):
+            response = self.post(self.user)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], str(admission.RETRY_AFTER))
+        self.assertFalse(Booking.objects.exists())
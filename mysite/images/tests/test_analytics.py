@@ -0,0 +1,71 @@
+import os
+import tempfile
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from images.analytics import utilization
+from images.models import Blackout, Booking, Court, Facility
+
+from . import LOCMEM_CACHES
+
+
+# No snapshot, so every booking is read from the database.
+NO_SNAPSHOT = os.path.join(tempfile.gettempdir(), "no-booking-snapshot")
+
+
+@override_settings(CACHES=LOCMEM_CACHES, BOOKING_SNAPSHOT_DIR=NO_SNAPSHOT)
+class UtilizationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create(username="p")
+        self.owner.profile.role = "provider"
+        self.owner.profile.save()
+        self.facility = Facility.objects.create(name="F", location="L", owner=self.owner, base_price=10)
+        self.courts = [Court.objects.create(facility=self.facility, name=f"C{i}") for i in (1, 2)]
+        self.day = timezone.localdate(timezone=self.facility.tzinfo) - timedelta(days=3)
+
+    def at(self, hour, days=0):
+        return timezone.make_aware(
+            datetime.combine(self.day + timedelta(days=days), time(hour)), self.facility.tzinfo,
+        )
+
+    def book(self, court, start, end, price, **fields):
+        return Booking.objects.create(
+            user=self.owner, facility=self.facility, court=court, start_dt=self.at(start), end_dt=self.at(end),
+            price=price, **fields,
+        )
+
+    def test_hours_revenue_and_heatmap(self):
+        self.book(self.courts[0], 10, 12, 20)
+        self.book(self.courts[1], 10, 11, 15, status="cancelled")
+        Blackout.objects.create(facility=self.facility, start_dt=self.at(8), end_dt=self.at(10))
+        stats = utilization(self.facility, self.day, self.day + timedelta(days=1))
+        # Open 08:00-22:00 on two courts for two days, less the two blacked-out hours on each court.
+        self.assertEqual(stats["available_hours"], 2 * 2 * 14 - 2 * 2)
+        self.assertEqual((stats["booked_hours"], stats["revenue"]), (2, 20))
+        np.testing.assert_allclose(stats["court_utilization"], [2 / 26, 0])
+        np.testing.assert_allclose(stats["daily"], [2 / 24, 0])
+        hour = self.day.weekday() * 24
+        np.testing.assert_allclose(stats["hour_of_week"][hour + 10], [1, 0])
+        self.assertTrue(np.isnan(stats["hour_of_week"][hour + 8]).all())
+        self.assertTrue(np.isnan(stats["hour_of_week"][hour + 23]).all())
+
+    def test_view_is_for_the_owner_only(self):
+        url = reverse("images:provider_analytics", args=[self.facility.pk])
+        self.client.force_login(self.owner)
+        response = self.client.get(url, {"from": self.day.isoformat(), "to": self.day.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["courts"], [(c.pk, c.name) for c in self.courts])
+        backwards = self.client.get(url, {"from": "2020-01-02", "to": "2020-01-01"})
+        self.assertRedirects(backwards, url, fetch_redirect_response=False)
+        rival = User.objects.create(username="r")
+        rival.profile.role = "provider"
+        rival.profile.save()
+        self.client.force_login(rival)
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,68 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from images.history import booking_history
+from images.models import Booking, BookingArchive, ChangeEvent, Facility, WaitlistEntry
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ArchiveBookingsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="u")
+        owner = User.objects.create(username="p")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+
+    def booking(self, days, **fields):
+        start = timezone.now() + timedelta(days=days)
+        return Booking.objects.create(
+            user=self.user, facility=self.facility, start_dt=start, end_dt=start + timedelta(hours=1), price=10,
+            **fields,
+        )
+
+    def archive(self, days=2, *args):
+        call_command("archive_bookings", "--older-than", str(days), *args, stdout=StringIO())
+
+    def test_moves_ended_and_old_cancelled_bookings(self):
+        ended = self.booking(-10, version=3)
+        upcoming = self.booking(3)
+        cancelled_long_ago = self.booking(5, status="cancelled")
+        Booking.objects.filter(pk=cancelled_long_ago.pk).update(created_at=timezone.now() - timedelta(days=10))
+        cancelled_recently = self.booking(5, status="cancelled")
+        self.archive()
+        self.assertEqual(
+            set(Booking.objects.values_list("pk", flat=True)), {upcoming.pk, cancelled_recently.pk},
+        )
+        copy = BookingArchive.objects.get(pk=ended.pk)
+        self.assertEqual((copy.start_dt, copy.price, copy.version), (ended.start_dt, 10, 3))
+        self.assertTrue(BookingArchive.objects.filter(pk=cancelled_long_ago.pk).exists())
+
+    def test_chunks_and_history_spans_both_tables(self):
+        old = [self.booking(-10 - i) for i in range(5)]
+        upcoming = self.booking(3)
+        self.archive(2, "--chunk", "2")
+        self.assertEqual(BookingArchive.objects.count(), 5)
+        history = {row["id"]: row["archived"] for row in booking_history(user=self.user)}
+        self.assertEqual(history, {**{b.pk: True for b in old}, upcoming.pk: False})
+
+    def test_archived_rows_leave_without_journal_events(self):
+        old = self.booking(-10)
+        entry = WaitlistEntry.objects.create(
+            user=self.user, facility=self.facility, start_dt=old.start_dt, end_dt=old.end_dt, status="booked",
+            booking=old,
+        )
+        events = ChangeEvent.objects.count()
+        self.archive()
+        self.assertFalse(Booking.objects.filter(pk=old.pk).exists())
+        self.assertTrue(BookingArchive.objects.filter(pk=old.pk).exists())
+        self.assertEqual(ChangeEvent.objects.count(), events)
+        entry.refresh_from_db()
+        self.assertIsNone(entry.booking)
@@ -0,0 +1,105 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.forms import modelform_factory
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from images import booking_updates
+from images.booking_updates import BookingConflict
+from images.models import Booking, Court, Facility, WaitlistEntry
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BookingVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("u", password="pw")
+        self.other = User.objects.create_user("v", password="pw")
+        owner = User.objects.create_user("p", password="pw")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.court = Court.objects.create(facility=self.facility, name="C1")
+        self.day = timezone.localdate(timezone=self.facility.tzinfo) + timedelta(days=2)
+        self.booking = self.book(self.user, 10)
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour)), self.facility.tzinfo)
+
+    def book(self, user, hour):
+        return Booking.objects.create(
+            user=user, facility=self.facility, court=self.court, start_dt=self.at(hour), end_dt=self.at(hour + 1),
+            price=10,
+        )
+
+    def moved(self, hour):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        booking.start_dt, booking.end_dt = self.at(hour), self.at(hour + 1)
+        return booking
+
+    def assertConflict(self, code, func, *args):
+        with self.assertRaises(BookingConflict) as caught:
+            func(*args)
+        self.assertEqual(caught.exception.code, code)
+
+    def test_cancel_requires_a_version(self):
+        self.assertConflict("stale", booking_updates.cancel, self.booking.pk, self.user, None)
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, "confirmed")
+
+    def test_cancel_with_an_old_version_is_stale(self):
+        booking_updates.modify(self.moved(13), 1)
+        self.assertConflict("stale", booking_updates.cancel, self.booking.pk, self.user, 1)
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, "confirmed")
+
+    def test_cancel_bumps_the_version_once(self):
+        cancelled = booking_updates.cancel(self.booking.pk, self.user, 1)
+        self.assertEqual((cancelled.status, cancelled.version), ("cancelled", 2))
+        self.assertConflict("cancelled", booking_updates.cancel, self.booking.pk, self.user, 2)
+
+    def test_cancel_inside_the_notice_period(self):
+        soon = timezone.now() + timedelta(minutes=30)
+        booking = Booking.objects.create(
+            user=self.user, facility=self.facility, start_dt=soon, end_dt=soon + timedelta(hours=1),
+        )
+        self.assertConflict("notice", booking_updates.cancel, booking.pk, self.user, 1)
+
+    def test_cancel_of_someone_elses_booking(self):
+        with self.assertRaises(Booking.DoesNotExist):
+            booking_updates.cancel(self.booking.pk, self.other, 1)
+
+    def test_modify_requires_a_current_version(self):
+        self.assertConflict("stale", booking_updates.modify, self.moved(13), None)
+        booking_updates.modify(self.moved(13), 1)
+        self.assertConflict("stale", booking_updates.modify, self.moved(15), 1)
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).start_dt, self.at(13))
+
+    def test_modify_rechecks_the_new_slot(self):
+        booking = self.moved(13)
+        self.book(self.other, 13)
+        self.assertConflict("clash", booking_updates.modify, booking, 1)
+        stored = Booking.objects.get(pk=self.booking.pk)
+        self.assertEqual((stored.start_dt, stored.version), (self.at(10), 1))
+
+    def test_modify_offers_the_old_slot_to_the_waitlist(self):
+        entry = WaitlistEntry.objects.create(
+            user=self.other, facility=self.facility, court=self.court, start_dt=self.at(9), end_dt=self.at(12),
+        )
+        booking_updates.modify(self.moved(15), 1)
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.held_start), ("held", self.at(10)))
+
+    def test_forms_cannot_set_the_version(self):
+        form = modelform_factory(Booking, fields="__all__")(instance=self.booking)
+        self.assertNotIn("version", form.fields)
+
+    def test_cancel_view_is_post_only_and_needs_the_version(self):
+        self.client.login(username="u", password="pw")
+        url = reverse("images:cancel_booking", args=[self.booking.pk])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.client.post(url)
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, "confirmed")
+        self.client.post(url, {"version": 1})
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, "cancelled")
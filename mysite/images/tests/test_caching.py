@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from images.caching import anonymous_page_cache, bump_tags
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnonymousPageCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = 0
+
+    def view(self, respond=None):
+        @anonymous_page_cache(lambda request: ["page-test"])
+        def page(request):
+            self.calls += 1
+            response = HttpResponse(f"render {self.calls}")
+            if respond:
+                respond(request, response)
+            return response
+
+        return page
+
+    def get_twice(self, page, **cookies):
+        responses = []
+        for _ in range(2):
+            request = self.factory.get("/page/")
+            request.COOKIES.update(cookies)
+            responses.append(page(request))
+        return responses
+
+    def test_anonymous_get_is_served_from_cache(self):
+        first, second = self.get_twice(self.view())
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.content, first.content)
+
+    def test_tag_bump_purges_the_page(self):
+        page = self.view()
+        self.get_twice(page)
+        bump_tags("page-test")
+        self.assertEqual(page(self.factory.get("/page/")).content, b"render 2")
+
+    def test_session_cookie_bypasses_cache(self):
+        self.get_twice(self.view(), **{settings.SESSION_COOKIE_NAME: "abc"})
+        self.assertEqual(self.calls, 2)
+
+    def test_messages_cookie_bypasses_cache(self):
+        self.get_twice(self.view(), **{CookieStorage.cookie_name: "pending"})
+        self.assertEqual(self.calls, 2)
+
+    def test_post_bypasses_cache(self):
+        page = self.view()
+        page(self.factory.post("/page/"))
+        page(self.factory.post("/page/"))
+        self.assertEqual(self.calls, 2)
+
+    def test_response_setting_a_cookie_is_not_stored(self):
+        self.get_twice(self.view(lambda request, response: response.set_cookie("seen", "1")))
+        self.assertEqual(self.calls, 2)
+
+    def test_response_issuing_a_csrf_token_is_not_stored(self):
+        self.get_twice(self.view(lambda request, response: get_token(request)))
+        self.assertEqual(self.calls, 2)
+
+    def test_error_response_is_not_stored(self):
+        def fail(request, response):
+            response.status_code = 404
+
+        self.get_twice(self.view(fail))
+        self.assertEqual(self.calls, 2)
@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from images.dashboard import provider_stats
+from images.models import Court, Facility, Schedule
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProviderStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user("owner", password="pw")
+
+    def add_facility(self, name):
+        facility = Facility.objects.create(name=name, location="L", owner=self.owner, base_price=10)
+        court = Court.objects.create(facility=facility, name="C1")
+        Schedule.objects.create(facility=facility, court=court, weekday=0, hours="08:00-12:00")
+        return facility
+
+    def test_query_count_does_not_grow_with_facilities(self):
+        for count in (1, 5):
+            while Facility.objects.filter(owner=self.owner).count() < count:
+                self.add_facility(f"F{Facility.objects.count()}")
+            cache.clear()
+            with self.assertNumQueries(4):
+                stats = provider_stats(self.owner)
+            self.assertEqual(len(stats), count)
+
+    def test_cached_schedules_are_not_reloaded(self):
+        self.add_facility("F")
+        provider_stats(self.owner)
+        cache.delete(f"dashboard:{self.owner.pk}")
+        with self.assertNumQueries(3):
+            provider_stats(self.owner)
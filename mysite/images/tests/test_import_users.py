@@ -0,0 +1,60 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from images.management.commands import import_users
+from images.models import UserProfile
+
+HEADER = "username,email,password,phone,role\n"
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "users.csv"
+
+    def run_import(self, text, *args):
+        self.path.write_text(text)
+        out, err = StringIO(), StringIO()
+        call_command("import_users", str(self.path), *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_users_with_profiles(self):
+        out, _ = self.run_import(HEADER + "ann,Ann@EXAMPLE.com,secret,555,provider\nbob,,,,\n", "--workers", "1")
+        self.assertIn("Imported 2 users (0 skipped)", out)
+        ann, bob = User.objects.order_by("username")
+        self.assertEqual(ann.email, "Ann@example.com")
+        self.assertTrue(ann.check_password("secret"))
+        self.assertFalse(bob.has_usable_password())
+        self.assertEqual((ann.profile.role, ann.profile.phone), ("provider", "555"))
+        self.assertEqual(bob.profile.role, "customer")
+        self.assertEqual(UserProfile.objects.count(), 2)
+
+    def test_skips_bad_duplicate_and_existing_rows(self):
+        User.objects.create(username="taken")
+        text = HEADER + "a,,pw,,\na,,pw,,\n,,pw,,\nb,,pw,,admin\ntaken,,pw,,\n"
+        out, err = self.run_import(text, "--workers", "1")
+        self.assertIn("Imported 1 users (4 skipped)", out)
+        self.assertIn("Line 3: skipped, duplicate username.", err)
+        self.assertIn("Line 4: skipped, no username.", err)
+        self.assertIn("Line 5: skipped, unknown role 'admin'.", err)
+        self.assertIn("Skipped 1 existing user(s), e.g. 'taken'.", err)
+
+    def test_missing_columns(self):
+        with self.assertRaisesMessage(CommandError, "Missing column(s): password"):
+            self.run_import("username,email\na,b\n")
+
+    def test_hashes_in_a_process_pool_across_batches(self):
+        rows = "".join(f"m{i},,pw{i},,\n" for i in range(5))
+        with mock.patch.object(import_users, "POOL_MIN_ROWS", 3):
+            out, _ = self.run_import(HEADER + rows, "--workers", "2", "--batch", "2")
+        self.assertIn("with 2 workers", out)
+        self.assertEqual(User.objects.count(), 5)
+        self.assertTrue(User.objects.get(username="m4").check_password("pw4"))
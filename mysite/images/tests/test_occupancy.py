@@ -0,0 +1,109 @@
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from images import booking_updates, journal
+from images.models import Blackout, Booking, Court, Facility, Occupancy
+from images.occupancy import day_occupancy, free_courts, reconcile
+from images.services import available_slots_court
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OccupancySyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="u")
+        owner = User.objects.create(username="p")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.court = Court.objects.create(facility=self.facility, name="C1")
+        self.day = timezone.localdate(timezone=self.facility.tzinfo) + timedelta(days=2)
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour)), self.facility.tzinfo)
+
+    def book(self, hour):
+        return Booking.objects.create(
+            user=self.user, facility=self.facility, court=self.court, start_dt=self.at(hour),
+            end_dt=self.at(hour + 1), price=10,
+        )
+
+    def free_starts(self):
+        return {s for s, _ in available_slots_court(self.court, self.day)}
+
+    def test_booking_is_taken_as_soon_as_it_is_saved(self):
+        self.book(10)
+        self.assertNotIn(self.at(10), self.free_starts())
+        self.assertIn(self.at(11), self.free_starts())
+
+    def test_modify_and_cancel_move_the_bits(self):
+        booking = self.book(10)
+        moved = Booking.objects.get(pk=booking.pk)
+        moved.start_dt, moved.end_dt = self.at(12), self.at(13)
+        booking_updates.modify(moved, 1)
+        self.assertIn(self.at(10), self.free_starts())
+        self.assertNotIn(self.at(12), self.free_starts())
+        booking_updates.cancel(booking.pk, self.user, 2)
+        self.assertEqual(day_occupancy(self.facility, self.day), {})
+
+    def test_blackout_and_deletes(self):
+        blackout = Blackout.objects.create(facility=self.facility, start_dt=self.at(14), end_dt=self.at(16))
+        self.assertNotIn(self.at(15), self.free_starts())
+        blackout.delete()
+        self.book(9).delete()
+        self.assertEqual(day_occupancy(self.facility, self.day), {})
+
+    def test_consumer_repairs_lost_rows(self):
+        self.book(10)
+        Occupancy.objects.all().delete()
+        journal.consume("occupancy", now=timezone.now() + timedelta(seconds=journal.SETTLE_SECONDS + 1))
+        self.assertNotIn(self.at(10), self.free_starts())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OccupancyReconcileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="u")
+        owner = User.objects.create(username="p")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.courts = [Court.objects.create(facility=self.facility, name=f"C{i}") for i in (1, 2)]
+        self.day = timezone.localdate(timezone=self.facility.tzinfo) + timedelta(days=2)
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour)), self.facility.tzinfo)
+
+    def book(self, court, hour):
+        return Booking.objects.create(
+            user=self.user, facility=self.facility, court=court, start_dt=self.at(hour), end_dt=self.at(hour + 1),
+        )
+
+    def rebuild(self, *args):
+        out = StringIO()
+        call_command("rebuild_occupancy", "--since", self.day.isoformat(), *args, stdout=out)
+        return out.getvalue()
+
+    def test_free_courts(self):
+        self.book(self.courts[0], 18)
+        self.assertEqual(free_courts(self.facility, self.at(18)), [self.courts[1]])
+        self.assertEqual(free_courts(self.facility, self.at(17)), self.courts)
+        Blackout.objects.create(facility=self.facility, start_dt=self.at(17), end_dt=self.at(18))
+        self.assertEqual(free_courts(self.facility, self.at(17)), [])
+
+    def test_verify_reports_and_rebuild_rewrites_drifted_rows(self):
+        booking = self.book(self.courts[0], 10)
+        # Queryset updates skip the signals that keep the bitsets in step.
+        Booking.objects.filter(pk=booking.pk).update(court=self.courts[1])
+        self.assertIn("2 occupancy rows differ", self.rebuild("--verify"))
+        self.assertEqual(reconcile(self.facility, self.day, self.day, apply=False), [
+            (self.courts[0].pk, self.day), (self.courts[1].pk, self.day),
+        ])
+        self.assertIn("2 occupancy rows rewritten", self.rebuild())
+        self.assertEqual(reconcile(self.facility, self.day, self.day, apply=False), [])
+        self.assertEqual(free_courts(self.facility, self.at(10)), [self.courts[0]])
@@ -0,0 +1,66 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from images.models import Court, Facility, PriceRule, Sport
+from images.pricing import price_table, quote, slot_prices
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PricingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = User.objects.create(username="p")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.tennis = Sport.objects.create(name="Tennis")
+        self.court = Court.objects.create(facility=self.facility, name="C1", sport=self.tennis)
+        self.other = Court.objects.create(facility=self.facility, name="C2")
+        # A Monday, so weekday rules are easy to read.
+        today = timezone.localdate(timezone=self.facility.tzinfo)
+        self.day = today + timedelta(days=7 - today.weekday())
+
+    def at(self, hour, days=0):
+        return timezone.make_aware(
+            datetime.combine(self.day + timedelta(days=days), time(hour)), self.facility.tzinfo,
+        )
+
+    def rule(self, price, **fields):
+        return PriceRule.objects.create(facility=self.facility, price_per_hour=price, **fields)
+
+    def test_base_price_without_rules(self):
+        self.assertEqual(quote(self.facility, self.court, self.at(10), self.at(12)), Decimal("20.00"))
+
+    def test_most_specific_rule_wins(self):
+        self.rule(15, start_time=time(18), end_time=time(21), label="peak")
+        self.rule(12, sport=self.tennis)
+        self.rule(30, court=self.court, start_time=time(20))
+        self.rule(40, weekdays="56", label="weekend")
+        slots = [(self.at(h), self.at(h + 1)) for h in (10, 18, 20)]
+        # Sport beats facility, court beats sport; the court without a sport gets the facility's peak rate.
+        self.assertEqual(slot_prices(self.facility, self.court, slots), [Decimal(12), Decimal(12), Decimal(30)])
+        self.assertEqual(slot_prices(self.facility, self.other, slots), [Decimal(10), Decimal(15), Decimal(15)])
+        self.assertEqual(slot_prices(self.facility, None, [(self.at(10, days=5), None)]), [Decimal(40)])
+
+    def test_priority_breaks_ties(self):
+        self.rule(20, priority=1)
+        self.rule(25)
+        self.assertEqual(quote(self.facility, None, self.at(10), self.at(11)), Decimal("20.00"))
+
+    def test_quote_sums_slots_across_rule_boundaries(self):
+        self.rule(15, start_time=time(18))
+        self.assertEqual(quote(self.facility, self.other, self.at(16), self.at(20)), Decimal("50.00"))
+
+    def test_table_is_cached_until_a_rule_changes(self):
+        price_table(self.facility)
+        with self.assertNumQueries(0):
+            price_table(self.facility)
+        rule = self.rule(18)
+        self.assertEqual(quote(self.facility, None, self.at(10), self.at(11)), Decimal("18.00"))
+        rule.delete()
+        self.assertEqual(quote(self.facility, None, self.at(10), self.at(11)), Decimal("10.00"))
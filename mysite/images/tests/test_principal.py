@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from images.models import Facility
+from images.principal import get_principal, load_user
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PrincipalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.provider = User.objects.create(username="p")
+        self.provider.profile.role = "provider"
+        self.provider.profile.save()
+        self.facilities = [
+            Facility.objects.create(name=name, location="L", owner=self.provider, base_price=10) for name in "FG"
+        ]
+        self.member = User.objects.create(username="u")
+
+    def test_load_user_reads_profile_and_owned_facilities_in_one_query(self):
+        with self.assertNumQueries(1):
+            user = load_user(self.provider.pk)
+            principal = user._principal
+            self.assertEqual(user.profile.role, "provider")
+        self.assertTrue(principal.is_provider)
+        self.assertEqual(principal.facility_ids, {f.pk for f in self.facilities})
+        self.assertTrue(principal.owns(str(self.facilities[0].pk)))
+        member = load_user(self.member.pk)._principal
+        self.assertEqual((member.is_provider, member.facility_ids), (False, frozenset()))
+        self.assertIsNone(load_user(0))
+
+    def test_fallback_for_users_loaded_elsewhere(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.provider.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_principal(request).facility_ids, {f.pk for f in self.facilities})
+            get_principal(request)
+
+    def test_provider_views_use_the_request_principal(self):
+        self.client.force_login(self.provider)
+        response = self.client.get(reverse("images:provider_facilities"))
+        self.assertEqual(response.status_code, 200)
+        # PrincipalBackend loaded the profile and principal along with the user.
+        self.assertIn("profile", response.wsgi_request.user._state.fields_cache)
+        other = Facility.objects.create(name="H", location="L", owner=self.member, base_price=10)
+        edit = self.client.get(reverse("images:provider_edit_facility", args=[other.pk]))
+        self.assertEqual(edit.status_code, 404)
+
+    def test_members_are_sent_away_from_provider_pages(self):
+        self.client.force_login(self.member)
+        response = self.client.get(reverse("images:provider_facilities"))
+        self.assertRedirects(response, reverse("images:facilities_list"), fetch_redirect_response=False)
@@ -0,0 +1,55 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from images.models import Booking, Court, Facility
+from images.services import search_free_slots
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SearchFreeSlotsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create(username="p")
+        self.day = timezone.localdate() + timedelta(days=2)
+
+    def facility(self, name, courts=2, sport="Tennis"):
+        facility = Facility.objects.create(name=name, location="L", owner=self.owner, base_price=10, sport_text=sport)
+        for i in range(courts):
+            Court.objects.create(facility=facility, name=f"C{i}")
+        return facility
+
+    def at(self, facility, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour)), facility.tzinfo)
+
+    def search_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            search_free_slots("tennis", self.day)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_the_facilities(self):
+        self.facility("A")
+        one = self.search_queries()
+        for name in "BCD":
+            self.facility(name)
+        self.assertEqual(self.search_queries(), one)
+
+    def test_booked_slots_and_other_sports_are_left_out(self):
+        tennis = self.facility("A", courts=1)
+        self.facility("B", courts=1, sport="Football")
+        court = tennis.courts.get()
+        Booking.objects.create(
+            user=self.owner, facility=tennis, court=court, start_dt=self.at(tennis, 10), end_dt=self.at(tennis, 11),
+        )
+        results = search_free_slots("tennis", self.day, time(9), time(12))
+        self.assertEqual(
+            [(s, c) for s, _, _, c in results], [(self.at(tennis, 9), court), (self.at(tennis, 11), court)]
+        )
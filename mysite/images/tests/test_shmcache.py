@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from images import shmcache
+from images.shmcache import SharedMemoryCache
+
+KEYS = 50
+
+
+def _add_all(cache, barrier, results):
+    barrier.wait()
+    results.put([cache.add(f"k{i}", os.getpid()) for i in range(KEYS)])
+
+
+class SharedMemoryCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = str(Path(tmp.name) / "test.cache")
+
+    def cache(self, max_entries=64, slot_size=256):
+        return SharedMemoryCache(self.path, {"OPTIONS": {"MAX_ENTRIES": max_entries, "SLOT_SIZE": slot_size}})
+
+    def test_basic_operations(self):
+        cache = self.cache()
+        cache.set("a", {"x": 1})
+        self.assertEqual(cache.get("a"), {"x": 1})
+        self.assertIsNone(cache.get("b"))
+        self.assertFalse(cache.add("a", 2))
+        self.assertTrue(cache.add("b", 2))
+        self.assertEqual(cache.incr("b", 5), 7)
+        self.assertEqual(cache.get("b"), 7)
+        with self.assertRaises(ValueError):
+            cache.incr("missing")
+        self.assertTrue(cache.touch("a", 60))
+        self.assertFalse(cache.touch("missing"))
+        self.assertTrue(cache.delete("a"))
+        self.assertFalse(cache.delete("a"))
+        self.assertFalse(cache.has_key("a"))
+        cache.clear()
+        self.assertIsNone(cache.get("b"))
+
+    def test_entries_are_shared_between_instances(self):
+        self.cache().set("a", 1)
+        self.assertEqual(self.cache().get("a"), 1)
+
+    def test_expiry(self):
+        cache = self.cache()
+        cache.set("short", 1, 1)
+        cache.set("touched", 1, 1)
+        cache.set("forever", 1, None)
+        self.assertTrue(cache.touch("touched", 60))
+        with mock.patch.object(shmcache.time, "time", return_value=time.time() + 2):
+            self.assertIsNone(cache.get("short"))
+            self.assertEqual(cache.get("touched"), 1)
+            self.assertEqual(cache.get("forever"), 1)
+            self.assertTrue(cache.add("short", 2))
+
+    def test_full_set_evicts_with_clock(self):
+        # One set: every key competes for the same eight slots.
+        cache = self.cache(max_entries=shmcache.WAYS)
+        for i in range(shmcache.WAYS):
+            cache.set(f"k{i}", i)
+        # Every slot was just written, so the hand clears them all and comes back to the first.
+        cache.set("new1", "x")
+        cache.get("k1")
+        # k1 was read since, so the hand skips it.
+        cache.set("new2", "x")
+        present = {key for key in [f"k{i}" for i in range(shmcache.WAYS)] + ["new1", "new2"] if cache.has_key(key)}
+        self.assertEqual(present, {"k1", "k3", "k4", "k5", "k6", "k7", "new1", "new2"})
+
+    def test_values_too_large_for_a_slot_are_not_stored(self):
+        cache = self.cache()
+        big = os.urandom(1024)
+        self.assertFalse(cache.add("big", big))
+        cache.set("big", big)
+        self.assertIsNone(cache.get("big"))
+        # Replacing a stored value with one that doesn't fit drops the old one too.
+        cache.set("a", 1)
+        cache.set("a", big)
+        self.assertIsNone(cache.get("a"))
+        # Compressible values are stored compressed.
+        cache.set("text", "x" * 4096)
+        self.assertEqual(cache.get("text"), "x" * 4096)
+
+    def test_file_with_other_sizes_is_replaced(self):
+        small = self.cache(slot_size=256)
+        small.set("a", 1)
+        inode = os.stat(self.path).st_ino
+        large = self.cache(slot_size=512)
+        self.assertIsNone(large.get("a"))
+        self.assertNotEqual(os.stat(self.path).st_ino, inode)
+        large.set("b", 2)
+        self.assertEqual(large.get("b"), 2)
+        with mock.patch.object(shmcache, "RECHECK_SECONDS", 0):
+            # The old mapping notices the new file and replaces it again with its own sizes.
+            self.assertIsNone(small.get("b"))
+            small.set("c", 3)
+            self.assertEqual(small.get("c"), 3)
+
+    def test_add_is_atomic_across_processes(self):
+        cache = self.cache(max_entries=256)
+        context = multiprocessing.get_context("fork")
+        n = 4
+        barrier, results = context.Barrier(n), context.Queue()
+        workers = [context.Process(target=_add_all, args=(cache, barrier, results)) for _ in range(n)]
+        for worker in workers:
+            worker.start()
+        wins = [results.get(timeout=30) for _ in workers]
+        for worker in workers:
+            worker.join()
+        self.assertEqual([sum(added) for added in zip(*wins)], [1] * KEYS)
+        winners = {cache.get(f"k{i}") for i in range(KEYS)}
+        self.assertTrue(winners <= {worker.pid for worker in workers})
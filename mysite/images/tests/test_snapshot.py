@@ -0,0 +1,64 @@
+import json
+import tempfile
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from images.analytics import utilization
+from images.models import Booking, Court, Facility
+from images.snapshot import load_snapshot, write_snapshot
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SnapshotAppendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name)
+        self.user = User.objects.create(username="u")
+        owner = User.objects.create(username="p")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.court = Court.objects.create(facility=self.facility, name="C1")
+        self.day = timezone.localdate(timezone=self.facility.tzinfo) - timedelta(days=1)
+
+    def book(self, hour, price=10):
+        start = timezone.make_aware(datetime.combine(self.day, time(hour)), self.facility.tzinfo)
+        return Booking.objects.create(
+            user=self.user, facility=self.facility, court=self.court, start_dt=start, end_dt=start + timedelta(hours=1),
+            price=price,
+        )
+
+    def build_two_days_ago(self):
+        """A full snapshot whose export, as far as readers can tell, began two days ago."""
+        write_snapshot(self.path, full=True)
+        meta = json.loads((self.path / "meta.json").read_text())
+        meta["settled_before"] = (timezone.now() - timedelta(days=2)).isoformat()
+        (self.path / "meta.json").write_text(json.dumps(meta))
+
+    def revenue(self):
+        return utilization(self.facility, self.day, self.day, snapshot=load_snapshot(self.path))["revenue"]
+
+    def test_append_moves_settled_before_forward(self):
+        self.build_two_days_ago()
+        booking = self.book(10)
+        write_snapshot(self.path)
+        # Changed behind the snapshot's back: only a read from the snapshot still sees the old price.
+        Booking.objects.filter(pk=booking.pk).update(price=99)
+        self.assertEqual(self.revenue(), 10)
+
+    def test_append_refreshes_rows_that_had_not_started(self):
+        cancelled, deleted = self.book(9), self.book(11)
+        self.book(13, price=25)
+        self.build_two_days_ago()
+        Booking.objects.filter(pk=cancelled.pk).update(status="cancelled")
+        deleted.delete()
+        self.assertEqual(write_snapshot(self.path), (0, 3))
+        Booking.objects.filter(pk=cancelled.pk).update(status="confirmed")
+        self.assertEqual(self.revenue(), 25)
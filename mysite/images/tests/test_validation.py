@@ -0,0 +1,80 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from images.models import Blackout, Booking, Court, Facility, WaitlistEntry
+from images.validation import validate_booking, validate_bookings
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ValidateBookingsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="u")
+        self.other = User.objects.create(username="v")
+        owner = User.objects.create(username="p")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.court = Court.objects.create(facility=self.facility, name="C1")
+        self.day = timezone.localdate(timezone=self.facility.tzinfo) + timedelta(days=2)
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(self.day, time(hour, minute)), self.facility.tzinfo)
+
+    def candidate(self, start, end, user=None, court=None):
+        return Booking(
+            user=user or self.user, facility=self.facility, court=court or self.court, start_dt=start, end_dt=end,
+        )
+
+    def codes(self, booking, now=None):
+        return [e.code for e in validate_booking(booking, now=now)]
+
+    def test_static_rules(self):
+        other_court = Court.objects.create(
+            facility=Facility.objects.create(name="G", location="L", base_price=10), name="C1",
+        )
+        cases = [
+            (self.candidate(self.at(11), self.at(10)), "order"),
+            (self.candidate(self.at(10), self.at(10, 30)), "slot_length"),
+            (self.candidate(self.at(6), self.at(7)), "hours"),
+            (self.candidate(self.at(21), self.at(23)), "hours"),
+            (self.candidate(self.at(10), self.at(11), court=other_court), "court"),
+        ]
+        for booking, code in cases:
+            with self.subTest(code=code, start=booking.start_dt):
+                self.assertEqual(self.codes(booking), [code])
+        self.assertEqual(self.codes(self.candidate(self.at(10), self.at(11)), now=self.at(9, 30)), ["lead_time"])
+        self.assertEqual(self.codes(self.candidate(self.at(10), self.at(12))), [])
+
+    def test_blackouts_clashes_and_holds(self):
+        Blackout.objects.create(facility=self.facility, start_dt=self.at(9), end_dt=self.at(10))
+        booked = Booking.objects.create(
+            user=self.other, facility=self.facility, court=self.court, start_dt=self.at(12), end_dt=self.at(13),
+        )
+        WaitlistEntry.objects.create(
+            user=self.other, facility=self.facility, court=self.court, start_dt=self.at(14), end_dt=self.at(16),
+            status="held", held_start=self.at(14), held_end=self.at(15),
+            hold_expires_at=timezone.now() + timedelta(minutes=10),
+        )
+        self.assertEqual(self.codes(self.candidate(self.at(9), self.at(10))), ["blackout"])
+        self.assertEqual(self.codes(self.candidate(self.at(12), self.at(14))), ["clash"])
+        self.assertEqual(self.codes(self.candidate(self.at(14), self.at(15))), ["held"])
+        # The holder may take their own slot, and a booking doesn't clash with itself.
+        self.assertEqual(self.codes(self.candidate(self.at(14), self.at(15), user=self.other)), [])
+        self.assertEqual(self.codes(booked), [])
+        other_court = Court.objects.create(facility=self.facility, name="C2")
+        self.assertEqual(self.codes(self.candidate(self.at(12), self.at(13), court=other_court)), [])
+
+    def test_batch_checks_candidates_against_each_other_in_one_query(self):
+        first = self.candidate(self.at(10), self.at(12))
+        overlapping = self.candidate(self.at(11), self.at(12), user=self.other)
+        elsewhere = self.candidate(self.at(15), self.at(16))
+        # Compiles the schedule onto the facility.
+        validate_bookings([elsewhere])
+        with self.assertNumQueries(1):
+            errors = validate_bookings([first, overlapping, elsewhere])
+        self.assertEqual([[e.code for e in errs] for errs in errors], [[], ["clash"], []])
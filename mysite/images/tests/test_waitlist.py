@@ -0,0 +1,84 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from images import booking_updates, waitlist
+from images.models import Blackout, Booking, Court, Facility, WaitlistEntry
+
+from . import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PromotionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("u", password="pw")
+        self.first = User.objects.create_user("w1", password="pw")
+        self.second = User.objects.create_user("w2", password="pw")
+        owner = User.objects.create_user("p", password="pw")
+        self.facility = Facility.objects.create(name="F", location="L", owner=owner, base_price=10)
+        self.court = Court.objects.create(facility=self.facility, name="C1")
+        self.day = timezone.localdate(timezone=self.facility.tzinfo) + timedelta(days=2)
+        self.booking = Booking.objects.create(
+            user=self.user, facility=self.facility, court=self.court, start_dt=self.at(10), end_dt=self.at(11),
+            price=10,
+        )
+
+    def at(self, hour):
+        return timezone.make_aware(datetime.combine(self.day, time(hour)), self.facility.tzinfo)
+
+    def wait(self, user, auto_book=False):
+        return WaitlistEntry.objects.create(
+            user=user, facility=self.facility, court=self.court, start_dt=self.at(9), end_dt=self.at(12),
+            auto_book=auto_book,
+        )
+
+    def cancel(self):
+        booking_updates.cancel(self.booking.pk, self.user, self.booking.version)
+
+    def test_cancel_holds_the_slot_for_the_first_waiter(self):
+        first, second = self.wait(self.first), self.wait(self.second)
+        self.cancel()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, first.held_start, first.held_end), ("held", self.at(10), self.at(11)))
+        self.assertEqual(second.status, "waiting")
+
+    def test_auto_book_waiter_gets_the_booking(self):
+        entry = self.wait(self.first, auto_book=True)
+        self.cancel()
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, "booked")
+        self.assertEqual((entry.booking.user, entry.booking.start_dt), (self.first, self.at(10)))
+
+    def test_leaving_a_hold_passes_it_on(self):
+        first, second = self.wait(self.first), self.wait(self.second)
+        self.cancel()
+        self.assertTrue(waitlist.leave(first.pk, self.first))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.status, second.held_start), ("cancelled", "held", self.at(10)))
+
+    def test_blacked_out_slot_is_not_offered(self):
+        entry = self.wait(self.first)
+        Blackout.objects.create(facility=self.facility, start_dt=self.at(10), end_dt=self.at(11))
+        waitlist.promote(self.facility, self.court, self.at(10), self.at(11))
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, "waiting")
+
+    def test_lapsed_hold_moves_to_the_next_waiter(self):
+        first, second = self.wait(self.first), self.wait(self.second)
+        self.cancel()
+        waitlist.expire_holds(now=timezone.now() + timedelta(minutes=waitlist.HOLD_MINUTES + 1))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.status, second.status), ("expired", "held"))
+
+    def test_waiting_entries_expire_with_their_window(self):
+        entry = self.wait(self.first)
+        self.assertEqual(waitlist.expire_waiting(now=self.at(12)), 1)
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, "expired")
@@ -0,0 +1,134 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db.models import BigIntegerField, CharField, F, Q, Value
+from django.utils import timezone
+
+from .models import Blackout, Booking, Facility, WaitlistEntry
+from .schedules import grid_for, minute_of_day
+
+LEAD_TIME = timedelta(hours=1)
+
+
+def _static_errors(booking, now):
+    facility = booking.facility if booking.facility_id else None
+    if facility is None:
+        return [ValidationError("Facility must be set.", code="facility")]
+    if booking.court_id and booking.court.facility_id != booking.facility_id:
+        return [ValidationError("Selected court doesn't belong to the chosen facility.", code="court")]
+    if not booking.start_dt or not booking.end_dt:
+        return [ValidationError("Start and end time are required.", code="required")]
+    if booking.start_dt >= booking.end_dt:
+        return [ValidationError("End time must be after start time.", code="order")]
+    local_start = timezone.localtime(booking.start_dt, facility.tzinfo)
+    local_end = timezone.localtime(booking.end_dt, facility.tzinfo)
+    grid = grid_for(facility, booking.court_id, local_start.weekday())
+    minutes = int((booking.end_dt - booking.start_dt).total_seconds() // 60)
+    if minutes <= 0 or minutes % grid.step != 0:
+        return [ValidationError(
+            "Booking length must be a positive multiple of the facility slot length.", code="slot_length"
+        )]
+    if local_start.date() != local_end.date() or not grid.covers(
+            minute_of_day(local_start), minute_of_day(local_end)):
+        return [ValidationError("Booking must be within facility opening hours.", code="hours")]
+    if (booking.start_dt - now) < LEAD_TIME:
+        return [ValidationError("Bookings must be made at least 1 hour in advance.", code="lead_time")]
+    return []
+
+
+def _conflict_rows(bookings, now):
+    """Blackouts, confirmed bookings and live waitlist holds touching any candidate, in one UNION query."""
+    window, held = Q(), Q()
+    for b in bookings:
+        window |= Q(facility_id=b.facility_id, start_dt__lt=b.end_dt, end_dt__gt=b.start_dt)
+        held |= Q(facility_id=b.facility_id, held_start__lt=b.end_dt, held_end__gt=b.start_dt)
+    columns = ("kind", "ref", "owner", "facility_ref", "court_ref", "start", "end")
+    blackouts = Blackout.objects.filter(window).annotate(
+        kind=Value("blackout", output_field=CharField()),
+        ref=F("pk"),
+        owner=Value(None, output_field=BigIntegerField()),
+        facility_ref=F("facility_id"),
+        court_ref=Value(None, output_field=BigIntegerField()),
+        start=F("start_dt"),
+        end=F("end_dt"),
+    ).values_list(*columns)
+    booked = Booking.objects.filter(window, status="confirmed").annotate(
+        kind=Value("booking", output_field=CharField()),
+        ref=F("pk"),
+        owner=F("user_id"),
+        facility_ref=F("facility_id"),
+        court_ref=F("court_id"),
+        start=F("start_dt"),
+        end=F("end_dt"),
+    ).values_list(*columns)
+    holds = WaitlistEntry.objects.filter(held, status="held", hold_expires_at__gt=now).annotate(
+        kind=Value("hold", output_field=CharField()),
+        ref=F("pk"),
+        owner=F("user_id"),
+        facility_ref=F("facility_id"),
+        court_ref=F("court_id"),
+        start=F("held_start"),
+        end=F("held_end"),
+    ).values_list(*columns)
+    return list(blackouts.union(booked, holds, all=True))
+
+
+def validate_bookings(bookings, now=None):
+    """Check every candidate booking, returning a list of ``ValidationError`` per candidate.
+
+    Static rules (court, length, opening hours, lead time) are checked in
+    Python; blackouts, clashes with stored bookings and other users' waitlist
+    holds come from a single combined query, and candidates in the same batch
+    are checked against each other.
+    """
+    now = now or timezone.now()
+    errors = [_static_errors(b, now) for b in bookings]
+    pending = [(i, b) for i, b in enumerate(bookings) if not errors[i]]
+    if not pending:
+        return errors
+
+    rows_by_facility = defaultdict(list)
+    for kind, ref, owner, facility_id, court_id, start, end in _conflict_rows([b for _, b in pending], now):
+        rows_by_facility[facility_id].append((kind, ref, owner, court_id, start, end))
+    accepted_by_facility = defaultdict(list)
+    for i, b in pending:
+        hits = [
+            (kind, ref, owner, court_id)
+            for kind, ref, owner, court_id, start, end in rows_by_facility[b.facility_id]
+            if start < b.end_dt and end > b.start_dt
+        ]
+        hits += [
+            ("booking", None, other.user_id, other.court_id)
+            for other in accepted_by_facility[b.facility_id]
+            if other.start_dt < b.end_dt and other.end_dt > b.start_dt
+        ]
+        same_target = [
+            (kind, ref, owner) for kind, ref, owner, court_id in hits
+            if not b.court_id or b.court_id == court_id
+        ]
+        if any(kind == "blackout" for kind, _, _, _ in hits):
+            errors[i].append(ValidationError("This time falls within a blackout period.", code="blackout"))
+        if any(kind == "booking" and (ref is None or ref != b.pk) for kind, ref, _ in same_target):
+            errors[i].append(ValidationError("This time overlaps with another booking.", code="clash"))
+        elif any(kind == "hold" and owner != b.user_id for kind, _, owner in same_target):
+            errors[i].append(ValidationError("This slot is being held for someone on the waitlist.", code="held"))
+        if not errors[i]:
+            accepted_by_facility[b.facility_id].append(b)
+    return errors
+
+
+def validate_booking(booking, now=None):
+    return validate_bookings([booking], now=now)[0]
+
+
+def lock_facility(facility_id):
+    """Hold ``facility_id``'s row until the surrounding transaction ends.
+
+    Booking writes that validate and then save take this first, so two
+    requests for the same facility can't both pass validation. SQLite
+    ignores ``FOR UPDATE``; there the settings open every transaction with
+    ``BEGIN IMMEDIATE``, which takes the database write lock up front and
+    serializes the same transactions as a whole.
+    """
+    list(Facility.objects.select_for_update().filter(pk=facility_id).values_list("pk"))
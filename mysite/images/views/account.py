@@ -0,0 +1,89 @@
+# images/views/account.py
+from django.contrib import messages
+from django.contrib.auth import logout
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+
+from ..models import UserProfile, FacilitySignupRequest
+from ..forms import RegisterForm, UserForm, ProfileForm, ProviderRegisterForm
+
+
+def register_view(request):
+    if request.method == "POST":
+        form = RegisterForm(request.POST)
+        if form.is_valid():
+            User.objects.create_user(
+                username=form.cleaned_data["username"],
+                email=form.cleaned_data["email"],
+                password=form.cleaned_data["password"],
+            )
+            messages.success(request, "Account created. Please log in.")
+            return redirect("images:login")
+    else:
+        form = RegisterForm()
+    return render(request, "account/register.html", {"form": form})
+
+
+@login_required
+def profile_view(request):
+    user = request.user
+    UserProfile.objects.get_or_create(user=user)
+
+    if request.method == "POST":
+        uf = UserForm(request.POST, instance=user)
+        pf = ProfileForm(request.POST, instance=user.profile)
+        if uf.is_valid() and pf.is_valid():
+            uf.save()
+            pf.save()
+            messages.success(request, "Profile updated.")
+            return redirect("images:profile")
+    else:
+        uf = UserForm(instance=user)
+        pf = ProfileForm(instance=user.profile)
+
+    return render(request, "account/profile.html", {"user_form": uf, "profile_form": pf})
+
+
+@require_POST
+def logout_post(request):
+    logout(request)
+    return redirect("images:login")
+
+
+def provider_register_view(request):
+    if request.method == "POST":
+        form = ProviderRegisterForm(request.POST)
+        if form.is_valid():
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=form.cleaned_data["username"],
+                    email=form.cleaned_data["email"],
+                    is_active=False,
+                    password=make_password(form.cleaned_data["password"]),
+                )
+                user.profile.role = "provider"
+                user.profile.phone = form.cleaned_data.get("phone", "")
+                user.profile.save()
+
+                FacilitySignupRequest.objects.create(
+                    user=user,
+                    facility_name=form.cleaned_data["facility_name"],
+                    offered_sports_text=form.cleaned_data["offered_sports_text"],
+                    location=form.cleaned_data["location"],
+                    description=form.cleaned_data.get("description", ""),
+                    open_time=form.cleaned_data["open_time"],
+                    close_time=form.cleaned_data["close_time"],
+                    num_courts=form.cleaned_data["num_courts"],
+                )
+            messages.success(
+                request,
+                "Submitted! Admin must approve your account before you can sign in.",
+            )
+            return redirect("images:login")
+    else:
+        form = ProviderRegisterForm()
+    return render(request, "account/provider_register.html", {"form": form})
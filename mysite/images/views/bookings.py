@@ -0,0 +1,226 @@
+# images/views/bookings.py
+from datetime import datetime, timedelta
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_POST, require_http_methods
+
+from ..models import Facility, Booking, Court, WaitlistEntry
+from ..forms import BookingForm, WaitlistForm
+from .. import admission, booking_updates, waitlist
+from ..history import booking_history
+from ..pricing import quote
+from ..services import notice_timeline
+from ..validation import lock_facility, validate_booking
+
+
+@login_required
+def my_bookings(request):
+    bookings = booking_history(user=request.user).order_by("-start_dt")
+    waitlist = (
+        WaitlistEntry.objects.filter(user=request.user, status__in=["waiting", "held"])
+        .select_related("facility", "court")
+        .order_by("start_dt")
+    )
+    return render(request, "bookings/my_bookings.html", {"bookings": bookings, "waitlist": waitlist})
+
+
+def _version(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _notify_cancelled(booking, user):
+    # The mail machinery loads on the first cancellation, not with every view module.
+    from django.core.mail import send_mail
+
+    send_mail(
+        "Booking cancelled",
+        f"Your booking for {booking.facility.name} was cancelled.",
+        "noreply@example.com",
+        [user.email],
+        fail_silently=True,
+    )
+
+
+@login_required
+@require_POST
+def cancel_booking(request, pk):
+    try:
+        b = booking_updates.cancel(pk, request.user, _version(request.POST.get("version")))
+    except Booking.DoesNotExist:
+        raise Http404
+    except booking_updates.BookingConflict as e:
+        messages.error(request, e.message)
+        return redirect("images:my_bookings")
+    _notify_cancelled(b, request.user)
+    messages.success(request, "Booking cancelled.")
+    return redirect("images:my_bookings")
+
+
+@login_required
+def booking_confirmed(request, pk):
+    booking = get_object_or_404(Booking, pk=pk, user=request.user)
+    return render(request, "bookings/confirmed.html", {"booking": booking})
+
+
+def _back_to_facility(facility):
+    try:
+        return redirect("images:facility_detail", pk=facility.id)
+    except Exception:
+        return redirect("images:facilities_list")
+
+
+@require_http_methods(["GET", "POST"])
+@login_required
+def book_view(request, facility_id):
+    facility = get_object_or_404(Facility, pk=facility_id)
+
+    court_raw = request.GET.get("court") or request.POST.get("court")
+    court_id = (court_raw or "").strip()
+
+    start_raw = request.GET.get("start") if request.method == "GET" else request.POST.get("start")
+    end_raw = request.GET.get("end") if request.method == "GET" else request.POST.get("end")
+    start_str = (start_raw or "").strip()
+    end_str = (end_raw or "").strip()
+    if not start_str or not end_str:
+        messages.error(request, "Missing start or end time.")
+        return _back_to_facility(facility)
+
+    try:
+        start = datetime.fromisoformat(start_str)
+        end = datetime.fromisoformat(end_str)
+        tz = facility.tzinfo
+        if timezone.is_naive(start): start = timezone.make_aware(start, tz)
+        if timezone.is_naive(end):   end = timezone.make_aware(end, tz)
+    except ValueError:
+        messages.error(request, "Invalid date/time format.")
+        return _back_to_facility(facility)
+
+    # Someone just took this slot; skip the lookups and validation queries.
+    slot = (facility.pk, court_id, start, end)
+    if slot in admission.taken:
+        messages.error(request, "This time overlaps with another booking.")
+        return _back_to_facility(facility)
+
+    court = get_object_or_404(Court, pk=court_id, facility=facility) if court_id else None
+
+    if not court and facility.courts.filter(is_active=True).exists():
+        messages.warning(request, "Choose a court to book.")
+        return _back_to_facility(facility)
+
+    booking = Booking(
+        facility=facility,
+        court=court,
+        user=request.user,
+        start_dt=start,
+        end_dt=end,
+    )
+
+    if request.method == "GET":
+        errors = validate_booking(booking)
+        if errors:
+            return _booking_rejected(request, facility, slot, errors)
+        with timezone.override(tz):
+            return render(
+                request,
+                "book/confirm.html",
+                {
+                    "facility": facility,
+                    "court": court,
+                    "start": start,
+                    "end": end,
+                    "price": quote(facility, court, start, end),  # <-- show this on the confirm page
+                    **notice_timeline(facility, timezone.localdate(start, tz)),
+                },
+            )
+
+    try:
+        with admission.gate(facility.pk), transaction.atomic():
+            lock_facility(facility.pk)
+            errors = validate_booking(booking)
+            if errors:
+                return _booking_rejected(request, facility, slot, errors)
+            booking.price = quote(facility, court, start, end)
+            booking.save()
+    except admission.Busy as e:
+        response = render(request, "book/busy.html", {"facility": facility, "retry_after": e.retry_after},
+                          status=429)
+        response["Retry-After"] = str(e.retry_after)
+        return response
+    admission.taken.add(*slot)
+    waitlist.claim(booking)
+
+    messages.success(request, "Booking created.")
+    return redirect("images:my_bookings")
+
+
+def _booking_rejected(request, facility, slot, errors):
+    # The shortcut answers with the clash message, so only clashes may feed it.
+    if any(e.code == "clash" for e in errors):
+        admission.taken.add(*slot)
+    messages.error(request, "; ".join(e.message for e in errors))
+    return _back_to_facility(facility)
+
+
+@login_required
+@require_POST
+def join_waitlist(request, facility_id):
+    facility = get_object_or_404(Facility, pk=facility_id)
+    with timezone.override(facility.tzinfo):
+        form = WaitlistForm(request.POST, facility=facility)
+        valid = form.is_valid()
+    if valid:
+        entry = form.save(commit=False)
+        entry.user = request.user
+        entry.facility = facility
+        entry.save()
+        messages.success(request, "You're on the waitlist. We'll let you know if a slot opens up.")
+        return redirect("images:my_bookings")
+    messages.error(request, "; ".join(e for errors in form.errors.values() for e in errors))
+    return _back_to_facility(facility)
+
+
+@login_required
+@require_POST
+def leave_waitlist(request, pk):
+    waitlist.leave(pk, request.user)
+    messages.success(request, "Removed from the waitlist.")
+    return redirect("images:my_bookings")
+
+
+@login_required
+def modify_booking(request, pk):
+    b = get_object_or_404(Booking, pk=pk, user=request.user, status="confirmed")
+    if (b.start_dt - timezone.now()) < timedelta(hours=1):
+        messages.error(request, "Modifications must be at least 1 hour in advance.")
+        return redirect("images:my_bookings")
+
+    with timezone.override(b.facility.tzinfo):
+        if request.method == "POST":
+            form = BookingForm(request.POST, instance=b, facility=b.facility)
+            form.instance.user = b.user
+            form.instance.facility = b.facility
+            form.instance.price = b.price
+
+            if form.is_valid():
+                try:
+                    booking_updates.modify(form.save(commit=False), _version(request.POST.get("version")))
+                except Booking.DoesNotExist:
+                    raise Http404
+                except booking_updates.BookingConflict as e:
+                    messages.error(request, e.message)
+                    return redirect("images:modify_booking", pk=b.pk)
+                messages.success(request, "Booking updated.")
+                return redirect("images:booking_confirmed", pk=b.pk)
+            messages.error(request, "Please correct the errors below.")
+        else:
+            form = BookingForm(instance=b, facility=b.facility)
+
+        return render(request, "bookings/modify.html", {"booking": b, "form": form})
@@ -0,0 +1,265 @@
+# images/views/provider.py
+from datetime import date, datetime, timedelta
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db import IntegrityError
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from ..models import Facility, Booking, Blackout, Court, Sport
+from ..forms import FacilityForm, CourtForm, BlackoutForm
+from ..blackouts import PREVIEW_LIMIT, affected_bookings, apply_blackout
+from ..dashboard import provider_stats
+from ..history import booking_history
+from ..principal import check_owner, provider_required
+
+
+@provider_required
+def provider_facilities(request):
+    facilities = Facility.objects.filter(owner=request.user).prefetch_related(
+        "courts__sport"
+    )
+    return render(request, "provider/facilities.html", {"facilities": facilities})
+
+
+@provider_required
+def provider_add_facility(request):
+    if request.method == "POST":
+        form = FacilityForm(request.POST, request.FILES)
+        if form.is_valid():
+            f = form.save(commit=False)
+            f.owner = request.user
+            f.save()
+
+            sport_name = (form.cleaned_data.get("sport_name") or "").strip()
+            if sport_name:
+                sport = Sport.objects.filter(name__iexact=sport_name).first()
+                if not sport:
+                    sport = Sport.objects.create(name=sport_name)
+                if not f.courts.exists():
+                    Court.objects.create(
+                        facility=f,
+                        name="Court 1",
+                        sport=sport,
+                        is_active=True,
+                    )
+
+            messages.success(request, "Facility created.")
+            return redirect("images:provider_facilities")
+        messages.error(request, "Please correct the errors below.")
+    else:
+        form = FacilityForm()
+
+    return render(request, "provider/add_facility.html", {"form": form})
+
+
+@login_required
+def provider_manage_courts(request, facility_id):
+    f = check_owner(request, facility_id)
+    courts = f.courts.order_by("name")
+
+    if request.method == "POST":
+        form = CourtForm(request.POST)
+        form.instance.facility = f
+        if form.is_valid():
+            form.instance.name = form.cleaned_data["name"].strip()
+            if f.courts.filter(name__iexact=form.instance.name).exists():
+                form.add_error("name", "A court with this name already exists for this facility.")
+            else:
+                try:
+                    form.save()
+                    messages.success(request, "Court added.")
+                    return redirect("images:provider_manage_courts", facility_id=f.id)
+                except IntegrityError:
+                    form.add_error("name", "A court with this name already exists for this facility.")
+    else:
+        form = CourtForm()
+
+    return render(
+        request,
+        "provider/manage_courts.html",
+        {"facility": f, "courts": courts, "form": form},
+    )
+
+
+@provider_required
+def provider_bookings(request):
+    bookings = booking_history(facility_id__in=request.principal.facility_ids).order_by("-start_dt")
+    page = Paginator(bookings, 50).get_page(request.GET.get("page"))
+    return render(request, "provider/bookings.html", {"bookings": page, "page": page})
+
+
+@provider_required
+def provider_dashboard(request):
+    return render(request, "provider/dashboard.html", {"stats": provider_stats(request.user)})
+
+
+ANALYTICS_DEFAULT_DAYS = 90
+ANALYTICS_MAX_DAYS = 366
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _percent(value):
+    return None if value != value else round(value * 100)
+
+
+@provider_required
+def provider_analytics(request, facility_id):
+    # NumPy is only loaded by the workers that serve analytics.
+    from ..analytics import utilization
+    from ..snapshot import load_snapshot
+
+    f = check_owner(request, facility_id)
+    today = timezone.localdate(timezone=f.tzinfo)
+    try:
+        last = date.fromisoformat(request.GET.get("to") or today.isoformat())
+        first = date.fromisoformat(
+            request.GET.get("from") or (last - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)).isoformat()
+        )
+    except ValueError:
+        messages.error(request, "Invalid date format.")
+        return redirect("images:provider_analytics", facility_id=f.id)
+    if first > last or (last - first).days >= ANALYTICS_MAX_DAYS:
+        messages.error(request, f"Choose a range of at most {ANALYTICS_MAX_DAYS} days.")
+        return redirect("images:provider_analytics", facility_id=f.id)
+
+    snapshot = load_snapshot()
+    stats = utilization(f, first, last, snapshot=snapshot)
+    column = next((i for i, (pk, _) in enumerate(stats["courts"]) if str(pk) == request.GET.get("court")), None)
+    week = stats["hour_of_week"][:, column] if column is not None else stats["hour_of_week_total"]
+    week = week.reshape(7, 24)
+    heatmap = [
+        (hour, [(_percent(v), f"{v:.2f}") for v in week[:, hour]])
+        for hour in range(24)
+        if not all(v != v for v in week[:, hour])
+    ]
+    trend = stats["trend"]
+    return render(
+        request,
+        "provider/analytics.html",
+        {
+            "facility": f,
+            "first": first,
+            "last": last,
+            "snapshot_at": datetime.fromisoformat(snapshot["snapshot_at"]) if snapshot else None,
+            "settled_before": datetime.fromisoformat(snapshot["settled_before"]) if snapshot else None,
+            "courts": stats["courts"],
+            "selected_court": stats["courts"][column][0] if column is not None else None,
+            "weekdays": WEEKDAYS,
+            "heatmap": heatmap,
+            "court_rows": [
+                (pk, name, _percent(u), None if r != r else r)
+                for (pk, name), u, r in zip(stats["courts"], stats["court_utilization"], stats["court_revpah"])
+            ],
+            "trend": [
+                (stats["days"][i + len(stats["days"]) - len(trend)], _percent(trend[i]))
+                for i in range(len(trend) - 1, -1, -7)
+            ][::-1],
+            "utilization": _percent(stats["booked_hours"] / stats["available_hours"])
+            if stats["available_hours"] else None,
+            "booked_hours": stats["booked_hours"],
+            "available_hours": stats["available_hours"],
+            "revenue": stats["revenue"],
+            "revpah": None if stats["revpah"] != stats["revpah"] else stats["revpah"],
+        },
+    )
+
+
+@provider_required
+def provider_edit_facility(request, facility_id):
+    facility = check_owner(request, facility_id)
+
+    if request.method == "POST":
+        form = FacilityForm(request.POST, request.FILES, instance=facility)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Facility updated.")
+            return redirect("images:provider_facilities")
+        messages.error(request, "Please fix the errors below.")
+    else:
+        form = FacilityForm(instance=facility)
+
+    return render(
+        request, "provider/edit_facility.html", {"form": form, "facility": facility}
+    )
+
+
+@provider_required
+@require_POST
+def provider_delete_facility(request, facility_id):
+    facility = check_owner(request, facility_id)
+
+    has_future_bookings = Booking.objects.filter(
+        facility=facility, status="confirmed", start_dt__gte=timezone.now()
+    ).exists()
+    if has_future_bookings:
+        messages.error(
+            request, "You cannot delete a facility with future confirmed bookings."
+        )
+        return redirect("images:provider_facilities")
+
+    facility.delete()
+    messages.success(request, "Facility deleted.")
+    return redirect("images:provider_facilities")
+
+
+def _save_blackout(request, f, instance=None):
+    form = BlackoutForm(request.POST or None, instance=instance)
+    affected = None
+    if request.method == "POST" and form.is_valid():
+        b = form.save(commit=False)
+        b.facility = f
+        if b.start_dt >= b.end_dt:
+            form.add_error("end_dt", "End must be after start.")
+        else:
+            impact = request.POST.get("impact")
+            affected = affected_bookings(f, b.start_dt, b.end_dt)
+            if impact in ("cancel", "notify") or not affected.exists():
+                cancelled = apply_blackout(b, cancel=impact == "cancel")
+                if cancelled:
+                    messages.success(request, f"Notice/blackout saved; {cancelled} bookings cancelled and notified.")
+                elif impact == "notify":
+                    messages.success(request, "Notice/blackout saved; affected customers notified.")
+                else:
+                    messages.success(request, "Notice/blackout saved.")
+                return redirect("images:provider_manage_blackouts", facility_id=f.id)
+    return render(
+        request,
+        "provider/manage_blackouts.html",
+        {
+            "facility": f,
+            "form": form,
+            "blackouts": f.blackouts.all(),
+            "editing": instance,
+            "affected": affected[:PREVIEW_LIMIT] if affected is not None else None,
+            "affected_count": affected.count() if affected is not None else 0,
+        },
+    )
+
+
+@login_required
+def provider_manage_blackouts(request, facility_id):
+    f = check_owner(request, facility_id)
+    with timezone.override(f.tzinfo):
+        return _save_blackout(request, f)
+
+
+@login_required
+def provider_edit_blackout(request, facility_id, blackout_id):
+    f = check_owner(request, facility_id)
+    b = get_object_or_404(Blackout, id=blackout_id, facility=f)
+    with timezone.override(f.tzinfo):
+        return _save_blackout(request, f, instance=b)
+
+
+@login_required
+@require_POST
+def provider_delete_blackout(request, facility_id, blackout_id):
+    f = check_owner(request, facility_id)
+    b = get_object_or_404(Blackout, id=blackout_id, facility=f)
+    b.delete()
+    messages.success(request, "Notice removed.")
+    return redirect("images:provider_manage_blackouts", facility_id=f.id)
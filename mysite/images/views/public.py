@@ -0,0 +1,166 @@
+# images/views/public.py
+from datetime import date, datetime, time, timedelta
+
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+
+from ..models import Facility, Court
+from ..forms import WaitlistForm
+from ..caching import FACILITY_LIST_TAG, anonymous_page_cache, facility_tag
+from ..pricing import slot_prices
+from ..schedules import grid_for
+from ..services import available_slots, available_slots_court, notice_timeline, search_free_slots
+
+
+@anonymous_page_cache(lambda request: [FACILITY_LIST_TAG])
+def home(request):
+    q = request.GET.get("q", "") or ""
+    sport = request.GET.get("sport", "") or ""
+    facilities = Facility.objects.all()
+    if q:
+        facilities = facilities.filter(Q(name__icontains=q) | Q(location__icontains=q))
+
+    typed_sports_qs = (
+        Facility.objects.exclude(sport_text="")
+        .values_list("sport_text", flat=True)
+        .distinct()
+    )
+    court_sports_qs = (
+        Court.objects.filter(sport__isnull=False)
+        .values_list("sport__name", flat=True)
+        .distinct()
+    )
+
+    seen, SPORT_OPTIONS = set(), []
+    for name in list(typed_sports_qs) + list(court_sports_qs):
+        if not name:
+            continue
+        k = name.casefold()
+        if k not in seen:
+            seen.add(k)
+            SPORT_OPTIONS.append(name)
+    SPORT_OPTIONS.sort(key=str.casefold)
+
+    if sport:
+        facilities = facilities.filter(
+            Q(sport_text__iexact=sport) | Q(courts__sport__name__iexact=sport)
+        ).distinct()
+
+    return render(
+        request,
+        "facilities/list.html",
+        {"facilities": facilities, "q": q, "sport": sport, "SPORT_OPTIONS": SPORT_OPTIONS},
+    )
+
+
+@anonymous_page_cache(lambda request, pk: [facility_tag(pk)])
+def facility_detail(request, pk):
+    f = get_object_or_404(Facility, pk=pk)
+    selected_date_str = request.GET.get("date")
+    selected_date = (
+        datetime.strptime(selected_date_str, "%Y-%m-%d").date()
+        if selected_date_str
+        else timezone.localdate(timezone=f.tzinfo)
+    )
+
+    courts = f.courts.filter(is_active=True).order_by("name")
+    has_courts = courts.exists()
+    selected_court = None
+    slots = []
+
+    if has_courts:
+        selected_court_id = request.GET.get("court")
+        if selected_court_id:
+            selected_court = get_object_or_404(Court, pk=selected_court_id, facility=f)
+            slots = available_slots_court(selected_court, selected_date)
+        else:
+            if "date" in request.GET:
+                messages.warning(request, "Choose a court to see availability.")
+    else:
+        slots = available_slots(f, selected_date)
+    slots = [(s, e, p) for (s, e), p in zip(slots, slot_prices(f, selected_court, slots))]
+
+    day = grid_for(f, selected_court.pk if selected_court else None, selected_date.weekday()).slots
+    opens, closes = (day[0][0], day[-1][1]) if day else (0, 0)
+    with timezone.override(f.tzinfo):
+        return render(
+            request,
+            "facilities/detail.html",
+            {
+                "facility": f,
+                "courts": courts,
+                "has_courts": has_courts,
+                "selected_court": selected_court,
+                "slots": slots,
+                "selected_date": selected_date,
+                "waitlist_form": WaitlistForm(facility=f, initial={
+                    "court": selected_court,
+                    "start_dt": datetime.combine(selected_date, time()) + timedelta(minutes=opens),
+                    "end_dt": datetime.combine(selected_date, time()) + timedelta(minutes=closes),
+                }),
+                **notice_timeline(f, selected_date),
+            },
+        )
+
+
+def facility_calendar(request, pk):
+    from ..analytics import month_availability
+
+    f = get_object_or_404(Facility, pk=pk)
+    today = timezone.localdate(timezone=f.tzinfo)
+    try:
+        first = datetime.strptime(request.GET["month"], "%Y-%m").date() if request.GET.get("month") \
+            else today.replace(day=1)
+    except ValueError:
+        messages.error(request, "Invalid month.")
+        return redirect("images:facility_calendar", pk=f.id)
+    court = None
+    if request.GET.get("court"):
+        court = get_object_or_404(Court, pk=request.GET["court"], facility=f, is_active=True)
+
+    days = month_availability(f, court, first.year, first.month)
+    cells = [None] * first.weekday() + days
+    cells += [None] * (-len(cells) % 7)
+    return render(request, "facilities/calendar.html", {
+        "facility": f,
+        "courts": f.courts.filter(is_active=True).order_by("name"),
+        "selected_court": court,
+        "month": first,
+        "previous_month": (first - timedelta(days=1)).replace(day=1),
+        "next_month": (first + timedelta(days=32)).replace(day=1),
+        "weeks": [cells[i:i + 7] for i in range(0, len(cells), 7)],
+        "today": today,
+    })
+
+
+def search_slots(request):
+    sport = (request.GET.get("sport") or "").strip()
+    location = (request.GET.get("location") or "").strip()
+    try:
+        selected_date = date.fromisoformat(request.GET.get("date") or timezone.localdate().isoformat())
+        start_time = time.fromisoformat(request.GET["from"]) if request.GET.get("from") else None
+        end_time = time.fromisoformat(request.GET["to"]) if request.GET.get("to") else None
+    except ValueError:
+        messages.error(request, "Invalid date/time format.")
+        return redirect("images:search_slots")
+
+    results = search_free_slots(sport, selected_date, start_time, end_time, location) if sport else []
+    page = Paginator(results, 20).get_page(request.GET.get("page"))
+    query = request.GET.copy()
+    query.pop("page", None)
+    return render(
+        request,
+        "facilities/search.html",
+        {
+            "sport": sport,
+            "location": location,
+            "selected_date": selected_date,
+            "start_time": start_time,
+            "end_time": end_time,
+            "page": page,
+            "query": query.urlencode(),
+        },
+    )
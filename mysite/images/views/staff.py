@@ -0,0 +1,96 @@
+# images/views/staff.py
+import csv
+from zoneinfo import ZoneInfo
+
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from ..models import FacilitySignupRequest
+from ..history import booking_history
+from ..profiling import captured_profiles, load_profile, summary
+
+PROFILES_SHOWN = 50
+
+
+@staff_member_required
+def usage_report_csv(request):
+    resp = HttpResponse(content_type="text/csv")
+    resp["Content-Disposition"] = 'attachment; filename="usage.csv"'
+    writer = csv.writer(resp)
+    writer.writerow(["Facility", "Date", "Bookings", "Revenue"])
+
+    rows = {}
+    for b in booking_history(status="confirmed"):
+        key = (b["facility_name"], timezone.localdate(b["start_dt"], ZoneInfo(b["facility_timezone"])))
+        rows.setdefault(key, {"count": 0, "rev": 0.0})
+        rows[key]["count"] += 1
+        rows[key]["rev"] += float(b["price"])
+
+    for (facility, day), agg in sorted(rows.items()):
+        writer.writerow([facility, day, agg["count"], agg["rev"]])
+
+    return resp
+
+
+@staff_member_required
+def facility_requests_list(request):
+    pending = (
+        FacilitySignupRequest.objects.filter(status="pending")
+        .select_related("user")
+        .order_by("created_at")
+    )
+    return render(request, "admin_facility/requests.html", {"pending": pending})
+
+
+@staff_member_required
+@require_POST
+def facility_request_approve(request, pk):
+    req = get_object_or_404(FacilitySignupRequest, pk=pk, status="pending")
+    with transaction.atomic():
+        user = req.user
+        user.is_active = True
+        user.save()
+        req.status = "approved"
+        req.save()
+    messages.success(
+        request, f"Approved '{user.username}'. They can now sign in and add their facilities."
+    )
+    return redirect("facility_requests")
+
+
+@staff_member_required
+@require_POST
+def facility_request_deny(request, pk):
+    req = get_object_or_404(FacilitySignupRequest, pk=pk, status="pending")
+    username = req.user.username
+    with transaction.atomic():
+        user = req.user
+        req.delete()
+        user.delete()
+    messages.success(request, f"Denied and removed '{username}'.")
+    return redirect("facility_requests")
+
+
+@staff_member_required
+def profiles_list(request):
+    profiles = captured_profiles()
+    return render(request, "admin_facility/profiles.html", {
+        "profiles": profiles[:PROFILES_SHOWN],
+        "total": len(profiles),
+    })
+
+
+@staff_member_required
+def profile_detail(request, profile_id):
+    found = load_profile(profile_id)
+    if found is None or not found[1].exists():
+        raise Http404("No such profile.")
+    meta, data = found
+    if request.GET.get("download"):
+        return FileResponse(open(data, "rb"), as_attachment=True, filename=data.name)
+    return render(request, "admin_facility/profile_detail.html", {"profile": meta, "summary": summary(meta, data)})
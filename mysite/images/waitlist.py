@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Blackout, Booking, Notification, WaitlistEntry
+from .pricing import quote
+from .validation import LEAD_TIME, validate_booking
+
+HOLD_MINUTES = 15
+MAX_ATTEMPTS = 5
+
+
+def _waiters(facility_id, court_id, start, end):
+    # Walks the waitlist_queue index in queue order, stopping after MAX_ATTEMPTS matches.
+    target = Q(court_id=court_id) | Q(court__isnull=True) if court_id else Q(court__isnull=True)
+    return (
+        WaitlistEntry.objects.select_for_update()
+        .filter(target, facility_id=facility_id, status="waiting", start_dt__lte=start, end_dt__gte=end)
+        .select_related("user", "facility")
+        .order_by("created_at")
+    )
+
+
+def _notify(entry, subject, body):
+    Notification.objects.create(user=entry.user, subject=subject, body=body)
+
+
+def promote(facility, court, start, end, now=None):
+    """Offer a freed slot to the first waiter whose window covers it.
+
+    Auto-book waiters are booked through the normal validation path; the
+    rest get a ``HOLD_MINUTES`` hold. Must run inside the transaction that
+    freed the slot. Returns the promoted entry, if any.
+    """
+    now = now or timezone.now()
+    if start - now < LEAD_TIME:
+        return None
+    # A slot freed by a blackout isn't free.
+    if Blackout.objects.filter(facility=facility, start_dt__lt=end, end_dt__gt=start).exists():
+        return None
+    court_id = court.pk if court else None
+    for entry in _waiters(facility.pk, court_id, start, end)[:MAX_ATTEMPTS]:
+        if entry.auto_book:
+            booking = Booking(
+                user=entry.user, facility=facility, court=court, start_dt=start, end_dt=end,
+                price=quote(facility, court, start, end),
+            )
+            if validate_booking(booking, now=now):
+                entry.status = "expired"
+                entry.save(update_fields=["status"])
+                continue
+            booking.save()
+            entry.status, entry.booking = "booked", booking
+            entry.save(update_fields=["status", "booking"])
+            _notify(entry, "Waitlist: you're booked",
+                    f"A slot opened at {facility.name} on {timezone.localtime(start, facility.tzinfo):%Y-%m-%d %H:%M} "
+                    f"and has been booked for you.")
+        else:
+            entry.court = court
+            entry.status = "held"
+            entry.held_start, entry.held_end = start, end
+            entry.hold_expires_at = now + timedelta(minutes=HOLD_MINUTES)
+            entry.save(update_fields=["court", "status", "held_start", "held_end", "hold_expires_at"])
+            _notify(entry, "Waitlist: a slot is held for you",
+                    f"A slot opened at {facility.name} on {timezone.localtime(start, facility.tzinfo):%Y-%m-%d %H:%M}. "
+                    f"It is held for you for {HOLD_MINUTES} minutes.")
+        return entry
+    return None
+
+
+def claim(booking):
+    """Mark the user's hold on ``booking``'s slot as booked."""
+    WaitlistEntry.objects.filter(
+        user=booking.user, facility=booking.facility, court=booking.court, status="held",
+        held_start=booking.start_dt, held_end=booking.end_dt,
+    ).update(status="booked", booking=booking)
+
+
+def leave(pk, user, now=None):
+    """Take ``user``'s entry off the waitlist, passing a slot held for it to the next waiter."""
+    with transaction.atomic():
+        entry = (
+            WaitlistEntry.objects.select_for_update().select_related("facility", "court")
+            .filter(pk=pk, user=user, status__in=["waiting", "held"]).first()
+        )
+        if entry is None:
+            return False
+        was_held = entry.status == "held"
+        entry.status = "cancelled"
+        entry.save(update_fields=["status"])
+        if was_held:
+            promote(entry.facility, entry.court, entry.held_start, entry.held_end, now=now)
+    return True
+
+
+def expire_waiting(now=None):
+    """Expire waiting entries whose window can no longer be offered. Returns how many."""
+    now = now or timezone.now()
+    return WaitlistEntry.objects.filter(status="waiting", end_dt__lte=now + LEAD_TIME).update(status="expired")
+
+
+def expire_holds(now=None):
+    """Expire lapsed holds and pass each slot on to the next waiter."""
+    now = now or timezone.now()
+    expired = 0
+    for entry in WaitlistEntry.objects.filter(status="held", hold_expires_at__lte=now).select_related(
+            "facility", "court"):
+        with transaction.atomic():
+            if not WaitlistEntry.objects.filter(pk=entry.pk, status="held").update(status="expired"):
+                continue
+            expired += 1
+            promote(entry.facility, entry.court, entry.held_start, entry.held_end, now=now)
+    return expired
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import hashlib
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,8 +45,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'images.principal.principal_middleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'images.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'mysite.urls'
@@ -75,12 +78,50 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock at BEGIN, so transactions that validate and then
+        # write (booking, modify) queue up instead of failing with "database is locked".
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
+# One cache for every worker on the host, kept in a memory-mapped file
+# (tmpfs where available); see images/shmcache.py.
+# One cache file per checkout, so deployments and test runs on a host don't share entries (or sessions).
+SHARED_CACHE_DIR = Path('/dev/shm') if Path('/dev/shm').is_dir() else BASE_DIR
+SHARED_CACHE_NAME = f"sports-reservation-{hashlib.sha1(str(BASE_DIR).encode()).hexdigest()[:12]}"
+
+CACHES = {
+    'default': {
+        'BACKEND': 'images.shmcache.SharedMemoryCache',
+        'LOCATION': str(SHARED_CACHE_DIR / f'{SHARED_CACHE_NAME}.cache'),
+        'KEY_PREFIX': SHARED_CACHE_NAME,
+        'OPTIONS': {'MAX_ENTRIES': 4096, 'SLOT_SIZE': 16384},
+    }
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Request profiling (images/profiling.py), listed at /admin/profiles/. Off for
+# ordinary traffic: set a sample rate or URL names to capture more than staff
+# requests sent with the header.
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_URL_NAMES = []
+PROFILE_HEADER = 'X-Profile'
+PROFILE_MODE = 'cprofile'  # or 'sample' for collapsed stacks
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_DIR = BASE_DIR / 'profiles'
+PROFILE_KEEP = 200
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
+# PrincipalBackend loads the user, their profile and owned facility ids in one
+# query; ModelBackend stays listed so existing sessions remain valid.
+AUTHENTICATION_BACKENDS = [
+    'images.principal.PrincipalBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -122,3 +163,11 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 LOGIN_URL = "images:login"
 LOGIN_REDIRECT_URL = "images:facilities_list"
 LOGOUT_REDIRECT_URL = "images:login"
+
+# Anonymous full-page cache for the facility list and detail pages; entries are
+# also purged whenever a facility they show changes.
+PAGE_CACHE_SECONDS = 60
+
+# Columnar booking export written by `manage.py snapshot_bookings`; provider
+# analytics read it instead of the live tables once it exists.
+BOOKING_SNAPSHOT_DIR = BASE_DIR / "snapshots"
@@ -16,12 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from images import views as image_views
+from images.views import staff as staff_views
 
 urlpatterns = [
-    path("admin/requests/", image_views.facility_requests_list, name="facility_requests"),
-    path("admin/requests/<int:pk>/approve/", image_views.facility_request_approve, name="facility_request_approve"),
-    path("admin/requests/<int:pk>/deny/", image_views.facility_request_deny, name="facility_request_deny"),
+    path("admin/requests/", staff_views.facility_requests_list, name="facility_requests"),
+    path("admin/requests/<int:pk>/approve/", staff_views.facility_request_approve, name="facility_request_approve"),
+    path("admin/requests/<int:pk>/deny/", staff_views.facility_request_deny, name="facility_request_deny"),
+    path("admin/profiles/", staff_views.profiles_list, name="profiles"),
+    path("admin/profiles/<str:profile_id>/", staff_views.profile_detail, name="profile_detail"),
 
     path('admin/', admin.site.urls),
     path("", include("images.urls")),